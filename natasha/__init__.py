@@ -1,57 +1,28 @@
-from yargy import Combinator as DefaultCombinator
-
-from natasha.grammars import (
-    Person,
-    Location,
-    Address,
-    Money,
-    Date,
-    Brand,
-    Event,
-    Organisation,
-)
-from natasha.grammars.pipelines import (
-    CommercialOrganisationPipeline,
-    SocialOrganisationPipeline,
-    EducationalOrganisationPipeline,
-    AbbreviationalOrganisationPipeline,
-    PersonPositionPipeline,
-)
+from natasha.utils import lazy_module
 
 __version__ = '0.5.0'
 
-DEFAULT_GRAMMARS = [
-    Money,
-    Person,
-    Location,
-    Address,
-    Date,
-    Brand,
-    Event,
-    Organisation,
-]
-
-DEFAULT_PIPELINES = [
-    CommercialOrganisationPipeline,
-    SocialOrganisationPipeline,
-    EducationalOrganisationPipeline,
-    AbbreviationalOrganisationPipeline,
-    PersonPositionPipeline,
-]
-
-
-class Combinator(DefaultCombinator):
-
-    '''
-    Modified version of yargy.Combinator with applied default pipelines
-    '''
-
-    def __init__(self, classes, pipelines=None, *args, **kwargs):
-        if pipelines is None:
-            pipelines = self.build_default_pipelines()
-        return super(Combinator, self).__init__(classes, pipelines=pipelines, *args, **kwargs)
-
-    def build_default_pipelines(self):
-        return [
-            pipeline() for pipeline in DEFAULT_PIPELINES
-        ]
+# grammars, pipelines and combinator are imported on first access,
+# so `from natasha import Money` doesn't import rules of other grammars
+lazy_module(__name__, {
+    'Person': 'natasha.grammars.person',
+    'ProbabilisticPerson': 'natasha.grammars.person',
+    'Location': 'natasha.grammars.location',
+    'Address': 'natasha.grammars.location',
+    'Money': 'natasha.grammars.money',
+    'Date': 'natasha.grammars.date',
+    'Brand': 'natasha.grammars.brand',
+    'Event': 'natasha.grammars.event',
+    'Organisation': 'natasha.grammars.organisation',
+    'ProbabilisticOrganisation': 'natasha.grammars.organisation',
+    'CommercialOrganisationPipeline': 'natasha.grammars.pipelines',
+    'SocialOrganisationPipeline': 'natasha.grammars.pipelines',
+    'EducationalOrganisationPipeline': 'natasha.grammars.pipelines',
+    'AbbreviationalOrganisationPipeline': 'natasha.grammars.pipelines',
+    'PersonPositionPipeline': 'natasha.grammars.pipelines',
+    'Combinator': 'natasha.combinator',
+    'DEFAULT_GRAMMARS': 'natasha.combinator',
+    'DEFAULT_PIPELINES': 'natasha.combinator',
+    'DEFAULT_BATCH_SIZE': 'natasha.combinator',
+    'MorphCache': 'natasha.morph',
+})
@@ -0,0 +1,172 @@
+# coding: utf-8
+'''
+Command line interface:
+
+    python -m natasha extract --grammars Person,Address --workers 8 input.txt > out.jsonl
+
+Each output line is JSON object with document key (path and line number
+for line-delimited input, path for --format files) and serialized matches,
+offsets of matches are relative to document. Progress is written to stderr
+'''
+from __future__ import unicode_literals, print_function
+
+import io
+import sys
+import json
+import argparse
+
+from timeit import default_timer as timer
+
+import natasha
+import natasha.grammars
+
+from natasha.parallel import ExtractionPool
+from natasha.serialization import serialize_match
+
+
+LINES_FORMAT = 'lines'
+FILES_FORMAT = 'files'
+
+DEFAULT_CHUNK_SIZE = 16
+DEFAULT_PROGRESS_INTERVAL = 5.0
+
+
+def parse_grammars(value):
+    '''
+    Returns grammars by comma-separated names, like "Person,Address"
+    '''
+    grammars = []
+    for name in value.split(','):
+        name = name.strip()
+        if name not in natasha.grammars.__all__:
+            raise argparse.ArgumentTypeError('Unknown grammar: {0!r}'.format(name))
+        grammars.append(getattr(natasha.grammars, name))
+    return grammars
+
+
+def open_input(path):
+    if path == '-':
+        return io.open(sys.stdin.fileno(), encoding='utf-8', closefd=False)
+    return io.open(path, encoding='utf-8')
+
+
+def open_output():
+    # stdout is encoded by locale, which may be ascii (LANG=C), so it's reopened as utf-8
+    sys.stdout.flush()
+    return io.open(sys.stdout.fileno(), 'w', encoding='utf-8', closefd=False)
+
+
+def read_documents(paths, format=LINES_FORMAT):
+    '''
+    Yields (key, text) for each non-empty line of each file or for each whole file
+    '''
+    for path in paths:
+        with open_input(path) as file:
+            if format == FILES_FORMAT:
+                yield {'path': path}, file.read()
+                continue
+            for number, line in enumerate(file, 1):
+                line = line.rstrip('\r\n')
+                if line.strip():
+                    yield {'path': path, 'line': number}, line
+
+
+def extract_documents(documents, grammars, workers=1, chunksize=DEFAULT_CHUNK_SIZE):
+    '''
+    Yields (key, matches) for each document in order of input, matches are serialized
+    by natasha.serialization.serialize_match
+    '''
+    if workers > 1:
+        with ExtractionPool(grammars, processes=workers, transform=serialize_match) as pool:
+            for item in pool.imap_with_keys(documents, chunksize=chunksize):
+                yield item
+    else:
+        combinator = natasha.Combinator(grammars)
+        for key, text in documents:
+            yield key, [
+                serialize_match(grammar, tokens) for grammar, tokens in combinator.extract(text)
+            ]
+
+
+class Progress(object):
+
+    '''
+    Writes number of documents and matches and throughput to stream every `interval` seconds
+    '''
+
+    def __init__(self, stream=sys.stderr, interval=DEFAULT_PROGRESS_INTERVAL):
+        self.stream = stream
+        self.interval = interval
+        self.started = self.reported = timer()
+        self.documents = 0
+        self.matches = 0
+
+    def update(self, matches):
+        self.documents += 1
+        self.matches += len(matches)
+        if self.interval and timer() - self.reported >= self.interval:
+            self.report()
+
+    def report(self, final=False):
+        self.reported = timer()
+        elapsed = self.reported - self.started
+        print(
+            '{0}documents: {1}, matches: {2}, elapsed: {3:.1f}s, {4:.1f} documents/s'.format(
+                'done, ' if final else '',
+                self.documents,
+                self.matches,
+                elapsed,
+                self.documents / elapsed if elapsed else 0.0,
+            ),
+            file=self.stream,
+        )
+
+
+def extract(args, output):
+    documents = read_documents(args.inputs, format=args.format)
+    progress = Progress(interval=args.progress)
+    for key, matches in extract_documents(documents, args.grammars, workers=args.workers, chunksize=args.chunksize):
+        key['matches'] = matches
+        output.write(json.dumps(key, ensure_ascii=False))
+        output.write('\n')
+        progress.update(matches)
+    progress.report(final=True)
+
+
+def main(args=None, output=None):
+    parser = argparse.ArgumentParser(prog='python -m natasha')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    command = commands.add_parser('extract', help='extract matches from texts into JSON lines')
+    command.add_argument('inputs', nargs='*', default=['-'], help='input files, - for stdin')
+    command.add_argument(
+        '--grammars',
+        type=parse_grammars,
+        default=natasha.DEFAULT_GRAMMARS,
+        help='comma-separated grammar names, all default grammars by default',
+    )
+    command.add_argument('--workers', type=int, default=1, help='number of processes')
+    command.add_argument(
+        '--format',
+        choices=(LINES_FORMAT, FILES_FORMAT),
+        default=LINES_FORMAT,
+        help='each line is document (default) or each file is document',
+    )
+    command.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_SIZE, help='documents sent to worker at once')
+    command.add_argument(
+        '--progress',
+        type=float,
+        default=DEFAULT_PROGRESS_INTERVAL,
+        help='interval of progress reports in seconds, 0 disables them',
+    )
+    args = parser.parse_args(args)
+    if output is not None:
+        extract(args, output=output)
+    else:
+        with open_output() as output:
+            extract(args, output=output)
+
+
+if __name__ == '__main__':
+    main()
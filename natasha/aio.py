@@ -0,0 +1,180 @@
+# coding: utf-8
+'''
+asyncio front-end for Combinator, requires Python 3.5.3+
+'''
+import asyncio
+
+from weakref import WeakKeyDictionary
+from functools import partial
+from threading import local
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from natasha import Combinator
+from natasha import parallel
+from natasha.parallel import strip_match
+
+
+THREAD_EXECUTOR = 'thread'
+PROCESS_EXECUTOR = 'process'
+
+try:
+    get_running_loop = asyncio.get_running_loop
+except AttributeError:
+    # python < 3.7, since 3.5.3 get_event_loop returns running loop when called from coroutine
+    get_running_loop = asyncio.get_event_loop
+
+
+def extract_in_worker(arguments, text):
+    '''
+    Extracts text in executor process, which is initialized on first text,
+    because ProcessPoolExecutor has no `initializer` before Python 3.7
+    '''
+    if parallel.combinator is None:
+        parallel.initialize_worker(*arguments)
+    return parallel.extract(text)
+
+
+class ThreadWorkers(local):
+
+    '''
+    Combinator of each executor thread: pipelines and grammars keep state
+    of current text, so combinator can't be shared between threads
+    '''
+
+    combinator = None
+
+    def __init__(self, grammars, pipelines):
+        self.grammars = grammars
+        self.pipelines = pipelines
+
+    def extract(self, text):
+        if self.combinator is None:
+            self.combinator = Combinator(self.grammars, pipelines=self.pipelines)
+        return list(self.combinator.extract(text))
+
+
+class AsyncCombinator(object):
+
+    '''
+    Runs Combinator.extract in executor, so extraction doesn't block event loop:
+        matches = await combinator.extract(text)
+        async for index, matches in combinator.extract_many(texts):
+            ...
+    With `executor='thread'` each of `workers` threads builds its own Combinator
+    on first text, with `executor='process'` texts are extracted by pool of processes
+    as in ExtractionPool (matches are passed to `transform` in worker process,
+    by default tokens are stripped of pymorphy2 internals).
+    At most `concurrency` texts (by default `workers`) of each event loop are submitted
+    to executor at once, other requests wait for free slot. When request is cancelled or `timeout` expires,
+    text, which isn't started yet, is removed from executor, but text, which is already
+    being extracted, holds its slot until extraction is finished
+    '''
+
+    def __init__(self, grammars, executor=THREAD_EXECUTOR, workers=1, concurrency=None,
+                 timeout=None, pipelines=None, transform=strip_match):
+        if executor == THREAD_EXECUTOR:
+            self.workers = ThreadWorkers(grammars, pipelines)
+            self.executor = ThreadPoolExecutor(max_workers=workers)
+            self.function = self.workers.extract
+        elif executor == PROCESS_EXECUTOR:
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+            self.function = partial(extract_in_worker, (grammars, pipelines, transform))
+        else:
+            raise ValueError('Unknown executor: {0!r}'.format(executor))
+        self.concurrency = concurrency or workers
+        self.timeout = timeout
+        self.semaphores = WeakKeyDictionary()
+
+    def get_semaphore(self, loop):
+        # semaphore is bound to event loop, so each loop has its own one
+        try:
+            return self.semaphores[loop]
+        except KeyError:
+            semaphore = self.semaphores[loop] = asyncio.Semaphore(self.concurrency)
+            return semaphore
+
+    async def extract(self, text, timeout=None):
+        '''
+        Returns list of (grammar, tokens) matches of text, raises asyncio.TimeoutError
+        when extraction takes longer than `timeout` (or default timeout) seconds
+        '''
+        if timeout is None:
+            timeout = self.timeout
+        loop = get_running_loop()
+        semaphore = self.get_semaphore(loop)
+        await semaphore.acquire()
+        try:
+            future = self.executor.submit(self.function, text)
+        except BaseException:
+            semaphore.release()
+            raise
+        # slot is released when executor is done with text, not when request is cancelled
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(semaphore.release))
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    async def extract_with_index(self, index, text, timeout):
+        return index, await self.extract(text, timeout=timeout)
+
+    def extract_many(self, texts, timeout=None):
+        '''
+        Returns asynchronous iterator of (index, matches) tuples in order of completion,
+        index is position of text in `texts` iterable, see ExtractionIterator
+        '''
+        return ExtractionIterator(self, texts, timeout)
+
+    def close(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close(wait=exc_type is None)
+
+
+class ExtractionIterator(object):
+
+    '''
+    Asynchronous iterator of AsyncCombinator.extract_many results (async generators
+    require Python 3.6). Only `concurrency` texts are read ahead, remaining requests
+    are cancelled when extraction fails or iterator is closed by `aclose`
+    '''
+
+    def __init__(self, combinator, texts, timeout):
+        self.combinator = combinator
+        self.texts = enumerate(texts)
+        self.timeout = timeout
+        self.pending = set()
+        self.done = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self.done:
+            for index, text in self.texts:
+                self.pending.add(asyncio.ensure_future(
+                    self.combinator.extract_with_index(index, text, self.timeout)
+                ))
+                if len(self.pending) >= self.combinator.concurrency:
+                    break
+            if not self.pending:
+                raise StopAsyncIteration
+            try:
+                done, self.pending = await asyncio.wait(
+                    self.pending,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                self.done = sorted(task.result() for task in done)
+            except BaseException:
+                self.cancel()
+                raise
+        return self.done.pop(0)
+
+    def cancel(self):
+        for task in self.pending:
+            task.cancel()
+        self.pending = set()
+
+    async def aclose(self):
+        self.cancel()
@@ -0,0 +1,275 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+from yargy.parser import Grammar, Operation, Stack
+from yargy.tokenizer import Token
+
+
+def get_common_prefix_length(values):
+    '''
+    Returns number of leading rules, which are the same objects in all values
+    '''
+    length = 0
+    for rules in zip(*values):
+        if any(rule is not rules[0] for rule in rules[1:]):
+            break
+        length += 1
+    return length
+
+
+def copy_token(token):
+    return Token(
+        token.value,
+        token.position,
+        token.forms[:],
+        token.normalization_type,
+        token.interpretation,
+    )
+
+
+def copy_state(source, target, rules_count=None):
+    '''
+    Copies stack & index of grammar (or grammars of operation) and states
+    of nested grammars from first `rules_count` rules
+    '''
+    if isinstance(source, Operation):
+        for source_grammar, target_grammar in zip(source.grammars, target.grammars):
+            copy_state(source_grammar, target_grammar)
+        return
+    target.index = source.index
+    target.stack = Stack(
+        (index, copy_token(token)) for (index, token) in source.stack
+    )
+    for source_rule, target_rule in zip(source.rules[:rules_count], target.rules):
+        if isinstance(source_rule, (Operation, Grammar)):
+            copy_state(source_rule, target_rule)
+
+
+def is_initial(grammar, rules_count=None):
+    '''
+    Checks that grammar (or all grammars of operation) and nested grammars
+    from first `rules_count` rules are in state after reset
+    '''
+    if isinstance(grammar, Operation):
+        return all(is_initial(x) for x in grammar.grammars)
+    return grammar.index == 0 and not grammar.stack and all(
+        is_initial(rule) for rule in grammar.rules[:rules_count] if isinstance(rule, (Operation, Grammar))
+    )
+
+
+def reset_state(grammar):
+    '''
+    Resets grammar (or grammars of operation) and all nested grammars: Grammar.reset
+    resets only its own stack & index, so nested grammar, which was matching when
+    stream ended, would continue its match on the next stream
+    '''
+    if isinstance(grammar, Operation):
+        for x in grammar.grammars:
+            reset_state(x)
+        return
+    grammar.reset()
+    for rule in grammar.rules:
+        if isinstance(rule, (Operation, Grammar)):
+            reset_state(rule)
+
+
+def get_reachable_rules(rules, prefix_length):
+    '''
+    For each rule index in shared prefix returns index of last rule, which can be
+    checked by Grammar.shift: optional and repeatable rules pass token to next rule
+    '''
+    reachable = []
+    for index in range(prefix_length):
+        last = index
+        while last < prefix_length:
+            rule = rules[last]
+            if not isinstance(rule, dict) or not (rule.get('optional') or rule.get('repeatable')):
+                break
+            last += 1
+        reachable.append(last)
+    return reachable
+
+
+def shift_grammar(grammar, token, matches):
+    grammar.shift(token)
+    match = grammar.reduce()
+    if match:
+        matches.append((grammar, match.flatten()))
+
+
+class GrammarGroup(object):
+
+    '''
+    Group of grammars, which rules start with the same `prefix_length` rule objects.
+    While token stream is matched by shared prefix, states of all grammars are the same,
+    so only state of leader grammar is updated. When leader leaves shared prefix,
+    its state is copied to other grammars, and they are matched by nested groups
+    (sharing longer prefixes) or one by one, until all grammars are reset again
+    '''
+
+    def __init__(self, units, prefix_length):
+        self.units = units
+        self.prefix_length = prefix_length
+        self.grammars = []
+        self.groups = []
+        for unit in units:
+            if isinstance(unit, GrammarGroup):
+                self.grammars.extend(unit.grammars)
+                self.groups.append(unit)
+            else:
+                self.grammars.append(unit)
+        self.leader = self.grammars[0]
+        self.reachable = get_reachable_rules(self.leader.rules, prefix_length)
+        self.reset()
+
+    def reset(self):
+        self.coupled = all(is_initial(x, self.prefix_length) for x in self.grammars)
+
+    def decouple(self):
+        for grammar in self.grammars[1:]:
+            copy_state(self.leader, grammar, self.prefix_length)
+        for group in self.groups:
+            group.coupled = True
+        self.coupled = False
+
+    def shift(self, token, matches):
+        '''
+        Shifts token into grammars of group, appends (grammar, tokens) to `matches`
+        and returns True, when all grammars are in initial state
+        '''
+        if self.coupled:
+            leader = self.leader
+            if leader.index < self.prefix_length and self.reachable[leader.index] < self.prefix_length:
+                leader.shift(token)
+                if leader.index < self.prefix_length:
+                    # reduce can't match inside of prefix, but nested grammar can move index
+                    leader.reduce()
+                    if leader.index < self.prefix_length:
+                        return is_initial(leader, self.prefix_length)
+                    self.decouple()
+                    return False
+                self.decouple()
+                for grammar in self.grammars:
+                    match = grammar.reduce()
+                    if match:
+                        matches.append((grammar, match.flatten()))
+                self.coupled = all(is_initial(x, self.prefix_length) for x in self.grammars)
+                return self.coupled
+            self.decouple()
+        initial = True
+        for unit in self.units:
+            if isinstance(unit, GrammarGroup):
+                if not unit.shift(token, matches):
+                    initial = False
+            else:
+                shift_grammar(unit, token, matches)
+                if initial and not is_initial(unit, self.prefix_length):
+                    initial = False
+        self.coupled = initial
+        return initial
+
+    def is_initial(self):
+        '''
+        Checks that all grammars of group are in initial state, while group is coupled
+        only state of leader is actual
+        '''
+        if self.coupled:
+            return is_initial(self.leader)
+        return all(is_initial_unit(unit) for unit in self.units)
+
+    def finish(self):
+        '''
+        Copies state of leader to other grammars, so they can be reduced one by one
+        '''
+        if self.coupled:
+            self.decouple()
+        for group in self.groups:
+            group.finish()
+
+
+def is_initial_unit(unit):
+    if isinstance(unit, GrammarGroup):
+        return unit.is_initial()
+    return is_initial(unit)
+
+
+def build_units(items, depth=0):
+    '''
+    Builds tree of groups from (grammar, rules) items, which share first `depth` rules
+    '''
+    buckets = OrderedDict()
+    units = []
+    for grammar, rules in items:
+        if len(rules) > depth:
+            key = id(rules[depth])
+            if key not in buckets:
+                buckets[key] = []
+                units.append(buckets[key])
+            buckets[key].append((grammar, rules))
+        else:
+            units.append(grammar)
+    for index, unit in enumerate(units):
+        if not isinstance(unit, list):
+            continue
+        if len(unit) == 1:
+            units[index] = unit[0][0]
+        else:
+            prefix_length = get_common_prefix_length([rules for _, rules in unit])
+            units[index] = GrammarGroup(build_units(unit, prefix_length), prefix_length)
+    return units
+
+
+class PrefixAutomaton(object):
+
+    '''
+    Matches grammars, which rules are built by concatenation of the same
+    rule lists (like Address.AdjFull, Address.AdjFullWithHn and Address.AdjFullWithHnAndLetter),
+    sharing their common prefixes. Results are the same as results of
+    matching all grammars one by one, and are returned in order of grammars
+    '''
+
+    def __init__(self, grammars, classes):
+        self.grammars = grammars
+        self.positions = {grammar: index for index, grammar in enumerate(grammars)}
+        items = []
+        for grammar in grammars:
+            rules = classes[grammar.name].value
+            if not isinstance(rules, list):
+                # grammars defined by operations are matched as is
+                rules = []
+            items.append((grammar, rules))
+        self.units = build_units(items)
+        self.groups = [unit for unit in self.units if isinstance(unit, GrammarGroup)]
+
+    def reset(self):
+        for group in self.groups:
+            group.reset()
+
+    def shift(self, token):
+        matches = []
+        for unit in self.units:
+            if isinstance(unit, GrammarGroup):
+                unit.shift(token, matches)
+            else:
+                shift_grammar(unit, token, matches)
+        if len(matches) > 1:
+            matches.sort(key=lambda match: self.positions[match[0]])
+        return matches
+
+    def is_initial(self):
+        return all(is_initial_unit(unit) for unit in self.units)
+
+    def parse(self, stream):
+        self.reset()
+        for token in stream:
+            for match in self.shift(token):
+                yield match
+        for group in self.groups:
+            group.finish()
+        for grammar in self.grammars:
+            match = grammar.reduce(end_of_stream=True)
+            if match:
+                yield grammar, match.flatten()
+            reset_state(grammar)
@@ -0,0 +1,520 @@
+# coding: utf-8
+from __future__ import unicode_literals, print_function
+
+import gc
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+from multiprocessing import Process, Queue, Event
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2
+    tracemalloc = None
+
+from natasha import (
+    Combinator,
+    DEFAULT_GRAMMARS,
+    DEFAULT_PIPELINES,
+)
+from natasha.grammars import Address
+from natasha.grammars.pipelines import MergedGazetteerPipeline
+
+
+DEFAULT_CORPUS_SIZE = 500
+DEFAULT_CORPUS_SEED = 1
+DEFAULT_REPEAT = 5
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+CORPUS_TEMPLATES = [
+    '{person} встретился с {position} {organisation} {date}.',
+    '{date} в {location} прошёл {event}, на который пришли {number} человек.',
+    'По словам {position}, {organisation} потратит на проект {money}.',
+    '{person} переехал по адресу {address} {date}.',
+    'Смартфоны {brand} подешевели до {money} после заявления {organisation}.',
+    'В {location} открылся офис {organisation}, сообщает {person}.',
+    '{event} пройдёт {date} в {location}, билеты стоят {money}.',
+    'Суд обязал {organisation} выплатить {person} {money}.',
+    'Контора расположена по адресу: {address}, телефон не указан.',
+    'Погода {date} будет хорошей, обещают синоптики, но зонт всё же пригодится.',
+]
+
+ADDRESS_TEMPLATES = [
+    '{street}, дом {number}',
+    '{street} дом {number} литера {letter}',
+    '{street}, д. {number}',
+    '{street}',
+]
+
+ADDRESS_STREETS = [
+    'улица Карла Маркса',
+    'Зеленая улица',
+    'ул. Нижняя Красносельская',
+    'Настасьинский пер.',
+    'улица Красной Гвардии',
+    'Николая Ершова улица',
+    'улица К. Маркса',
+    'пр-кт Обуховской Обороны',
+    '1-я новорублевская улица',
+    'проспект 50 лет октября',
+    '2-ой проезд Перова Поля',
+    '7-я ул. текстильщиков',
+]
+
+CORPUS_SLOTS = {
+    'person': [
+        'Иван Петрович Сидоров',
+        'Анна Каренина',
+        'Владимир Путин',
+        'Мария Ивановна Кузнецова',
+        'Пётр Иванов',
+        'Сергей Шойгу',
+    ],
+    'position': [
+        'генеральным директором',
+        'министром финансов',
+        'президентом',
+        'председателем правления',
+    ],
+    'organisation': [
+        'ПАО «Газпром»',
+        'ООО «Рога и копыта»',
+        'Московского государственного университета',
+        'ФСБ',
+        'Министерства обороны',
+        'ОАО «РЖД»',
+    ],
+    'location': [
+        'Москве',
+        'Нижнем Новгороде',
+        'Санкт-Петербурге',
+        'Российской Федерации',
+        'Казани',
+    ],
+    'address': [
+        'улица Карла Маркса, дом 1',
+        'г. Москва, ул. Тверская, д. 7',
+        'проспект Мира, 15, корпус 2',
+        'Ленинградское шоссе, дом 16а',
+    ],
+    'date': [
+        '21 мая 1996 года',
+        'в прошлую пятницу',
+        'в следующем месяце',
+        '1 января',
+        'в 2015 году',
+    ],
+    'money': [
+        '1 миллион долларов',
+        '5 млрд. рублей',
+        '150 тысяч евро',
+        '3,5 млн рублей',
+    ],
+    'brand': [
+        'Apple',
+        'Samsung',
+        'Nokia',
+    ],
+    'event': [
+        'фестиваль «Нашествие»',
+        'чемпионат мира по футболу',
+        'шоу «Вернувшиеся»',
+        'Олимпийские игры',
+    ],
+    'number': [
+        'сто',
+        '2000',
+        'несколько тысяч',
+    ],
+}
+
+
+def build_corpus(size=DEFAULT_CORPUS_SIZE, seed=DEFAULT_CORPUS_SEED):
+    '''
+    Returns list of `size` synthetic russian texts, generated from templates,
+    same seed always produces same corpus
+    '''
+    generator = random.Random(seed)
+    texts = []
+    for _ in range(size):
+        sentences = []
+        for _ in range(generator.randint(1, 4)):
+            template = generator.choice(CORPUS_TEMPLATES)
+            sentences.append(template.format(**{
+                name: generator.choice(values) for name, values in CORPUS_SLOTS.items()
+            }))
+        texts.append(' '.join(sentences))
+    return texts
+
+
+def build_address_corpus(size=DEFAULT_CORPUS_SIZE, seed=DEFAULT_CORPUS_SEED):
+    '''
+    Returns list of `size` texts, which consist of multiple addresses
+    '''
+    generator = random.Random(seed)
+    return [
+        ', '.join(
+            generator.choice(ADDRESS_TEMPLATES).format(
+                street=generator.choice(ADDRESS_STREETS),
+                number=generator.randint(1, 200),
+                letter=generator.choice('АБВ'),
+            ) for _ in range(generator.randint(1, 5))
+        ) for _ in range(size)
+    ]
+
+
+def percentile(values, rank):
+    values = sorted(values)
+    return values[int(round(rank * (len(values) - 1)))]
+
+
+def measure(function, *args):
+    '''
+    Returns time of function call in seconds, garbage collection
+    is disabled during call, like in timeit
+    '''
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.time()
+        function(*args)
+        return time.time() - start
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def get_spread(runs):
+    '''
+    Returns relative difference between maximal and minimal time of runs,
+    which estimates noise of measurement
+    '''
+    fastest = min(runs)
+    return (max(runs) - fastest) / fastest if fastest else 0.0
+
+
+def measure_peak_memory(function):
+    '''
+    Returns peak memory in kilobytes allocated by python objects during call of function,
+    or None when tracemalloc isn't available
+    '''
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak // 1024
+
+
+def benchmark(function, inputs, tokens):
+    '''
+    Calls function for each input and returns throughput (tokens per second),
+    median and 99th percentile of latency in milliseconds and peak memory usage
+    '''
+    latencies = [measure(function, value) for value in inputs]
+    seconds = sum(latencies)
+
+    def run():
+        for value in inputs:
+            function(value)
+
+    return {
+        'seconds': seconds,
+        'tokens_per_second': tokens / seconds if seconds else None,
+        'latency_p50': percentile(latencies, 0.5) * 1000,
+        'latency_p99': percentile(latencies, 0.99) * 1000,
+        'peak_memory': measure_peak_memory(run),
+    }
+
+
+def benchmark_construction():
+    '''
+    Measures time of Combinator construction with default grammars and pipelines
+    '''
+    def construct(_):
+        Combinator(DEFAULT_GRAMMARS)
+
+    results = benchmark(construct, [None], tokens=0)
+    del results['tokens_per_second']
+    return results
+
+
+def benchmark_pipelines(combinator, texts):
+    '''
+    Measures each of default pipelines and merged gazetteer pipeline over tokenized corpus
+    '''
+    streams = [list(combinator.parser.tokenizer.transform(text)) for text in texts]
+    tokens = sum(len(stream) for stream in streams)
+    pipelines = [pipeline() for pipeline in DEFAULT_PIPELINES]
+    results = {}
+    for pipeline in pipelines + [MergedGazetteerPipeline(pipelines)]:
+        results[pipeline.__class__.__name__] = benchmark(
+            lambda stream: list(pipeline(iter(stream))),
+            streams,
+            tokens,
+        )
+    return results
+
+
+def benchmark_grammars(combinator, texts):
+    '''
+    Measures parsing of corpus by members of each grammar enum,
+    tokenization and pipelines are excluded
+    '''
+    streams = [list(combinator.tokenize(text)) for text in texts]
+    tokens = sum(len(stream) for stream in streams)
+    results = {}
+    for enum in DEFAULT_GRAMMARS:
+        grammars = [
+            grammar for grammar in combinator.grammars if isinstance(combinator.classes[grammar.name], enum)
+        ]
+        results[enum.__name__] = benchmark(
+            lambda stream: list(combinator.parse(stream, grammars)),
+            streams,
+            tokens,
+        )
+    return results
+
+
+def benchmark_extract_many(texts, tokens):
+    '''
+    Measures extraction of corpus text by text and by extract_many, which memoizes
+    word forms per batch. Shared morphological cache is disabled, so both runs analyze
+    words from scratch and only the effect of memoization is measured
+    '''
+    combinator = Combinator(DEFAULT_GRAMMARS, morph_cache=False)
+    results = {}
+    for name, function in (
+        ('extract', lambda: [list(combinator.extract(text)) for text in texts]),
+        ('extract_many', lambda: list(combinator.extract_many(texts))),
+    ):
+        seconds = measure(function)
+        results[name] = {
+            'seconds': seconds,
+            'tokens_per_second': tokens / seconds if seconds else None,
+        }
+    return results
+
+
+def benchmark_extraction(size=DEFAULT_CORPUS_SIZE, seed=DEFAULT_CORPUS_SEED, repeat=DEFAULT_REPEAT):
+    '''
+    Runs all benchmarks over synthetic corpus `repeat` times and returns report
+    with the best results of runs, see `merge_runs`
+    '''
+    texts = build_corpus(size=size, seed=seed)
+    combinator = Combinator(DEFAULT_GRAMMARS)
+    tokens = sum(len(list(combinator.parser.tokenizer.transform(text))) for text in texts)
+    report = merge_runs([
+        {
+            'construction': benchmark_construction(),
+            'pipelines': benchmark_pipelines(combinator, texts),
+            'grammars': benchmark_grammars(combinator, texts),
+            'extract': benchmark(lambda text: list(combinator.extract(text)), texts, tokens),
+            'extract_many': benchmark_extract_many(texts, tokens),
+            'address_prefixes': benchmark_address_prefixes(size=size, seed=seed),
+        } for _ in range(repeat)
+    ])
+    report['corpus'] = {
+        'texts': len(texts),
+        'tokens': tokens,
+        'characters': sum(len(text) for text in texts),
+        'seed': seed,
+        'repeat': repeat,
+    }
+    return report
+
+
+# metrics, which values are better when higher,
+# all other numeric metrics are better when lower
+HIGHER_IS_BETTER = {'tokens_per_second'}
+
+# metrics, which are measured with time, so they are as noisy as `spread` of runs
+TIMING_METRICS = {
+    'seconds',
+    'tokens_per_second',
+    'latency_p50',
+    'latency_p99',
+}
+
+COMPARED_METRICS = TIMING_METRICS | {'peak_memory'}
+
+
+def merge_runs(runs):
+    '''
+    Merges reports of repeated runs: timing metrics are taken from the best run,
+    so slowdowns caused by other processes are ignored, and `spread` of run times
+    is added next to each `seconds` metric, other values are taken from the first run
+    '''
+    first = runs[0]
+    merged = {}
+    for key, value in first.items():
+        values = [run[key] for run in runs]
+        if isinstance(value, dict):
+            merged[key] = merge_runs(values)
+        elif key in TIMING_METRICS and value is not None:
+            merged[key] = max(values) if key in HIGHER_IS_BETTER else min(values)
+        else:
+            merged[key] = value
+    if 'seconds' in first:
+        merged['spread'] = get_spread([run['seconds'] for run in runs])
+    return merged
+
+
+def compare(report, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD, path=()):
+    '''
+    Yields (path, baseline value, current value) for each metric, which is worse
+    than in baseline by more than `threshold` ratio. Timings are allowed to differ
+    additionally by the largest spread of runs in both reports, so measurement
+    noise isn't reported as regression
+    '''
+    noise = max(report.get('spread') or 0, baseline.get('spread') or 0)
+    for key, value in report.items():
+        expected = baseline.get(key)
+        if isinstance(value, dict) and isinstance(expected, dict):
+            for regression in compare(value, expected, threshold, path + (key,)):
+                yield regression
+        elif key in COMPARED_METRICS and value is not None and expected:
+            allowed = threshold + noise if key in TIMING_METRICS else threshold
+            if key in HIGHER_IS_BETTER:
+                regressed = value < expected / (1 + allowed)
+            else:
+                regressed = value > expected * (1 + allowed)
+            if regressed:
+                yield '.'.join(path + (key,)), expected, value
+
+
+def benchmark_address_prefixes(size=DEFAULT_CORPUS_SIZE, seed=DEFAULT_CORPUS_SEED):
+    '''
+    Measures Address grammars over address-heavy corpus with and without
+    sharing of common rule prefixes
+    '''
+    texts = build_address_corpus(size=size, seed=seed)
+    results = {}
+    for shared in (True, False):
+        combinator = Combinator([Address], share_prefixes=shared, prefilter=False)
+        streams = [list(combinator.tokenize(text)) for text in texts]
+        results['shared' if shared else 'separate'] = benchmark(
+            lambda stream: list(combinator.parse(stream, combinator.grammars)),
+            streams,
+            sum(len(stream) for stream in streams),
+        )
+    return results
+
+
+def read_memory():
+    '''
+    Returns RSS, PSS and private memory of current process in kilobytes,
+    or None when /proc/self/smaps_rollup isn't available (linux only)
+    '''
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        return None
+    memory = {}
+    with open('/proc/self/smaps_rollup') as file:
+        for line in file:
+            name, _, value = line.partition(':')
+            if name in ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty'):
+                memory[name] = int(value.split()[0])
+    return {
+        'rss': memory['Rss'],
+        'pss': memory['Pss'],
+        'private': memory['Private_Clean'] + memory['Private_Dirty'],
+    }
+
+
+def get_dictionary_size():
+    '''
+    Returns total size in kilobytes of compiled dictionaries of default pipelines
+    '''
+    return sum(
+        os.path.getsize(pipeline.Path) for pipeline in DEFAULT_PIPELINES if pipeline.Path
+    ) / 1024.0
+
+
+def gazetteer_worker(pipelines, queue, sample, done):
+    before = read_memory()
+    if pipelines is None:
+        pipelines = [pipeline() for pipeline in DEFAULT_PIPELINES]
+    for pipeline in pipelines:
+        # touch every page of dictionary
+        pipeline.dictionary.keys()
+    queue.put(None)
+    sample.wait()
+    after = read_memory()
+    queue.put({key: after[key] - before[key] for key in after})
+    done.wait()
+
+
+def benchmark_gazetteer_memory(workers=4):
+    '''
+    Starts `workers` processes, which either load gazetteer dictionaries of default
+    pipelines themselves or inherit them from parent process, and returns average
+    growth of memory per worker when all of them are alive. Compiled dictionaries
+    are small (about 24 KB in total), so sharing them between workers, e.g. by
+    memory mapping of dictionary files, saves less than measurement noise
+    '''
+    if read_memory() is None:
+        return None
+    inherited = [pipeline() for pipeline in DEFAULT_PIPELINES]
+    results = {
+        'dictionary_size': get_dictionary_size(),
+    }
+    for name, pipelines in (('private', None), ('inherited', inherited)):
+        queue, sample, done = Queue(), Event(), Event()
+        processes = [
+            Process(target=gazetteer_worker, args=(pipelines, queue, sample, done))
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for _ in processes:
+            queue.get()
+        sample.set()
+        samples = [queue.get() for _ in processes]
+        done.set()
+        for process in processes:
+            process.join()
+        results[name] = {
+            key: float(sum(x[key] for x in samples)) / workers for key in samples[0]
+        }
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog='python -m natasha.bench')
+    parser.add_argument('--size', type=int, default=DEFAULT_CORPUS_SIZE, help='number of texts in corpus')
+    parser.add_argument('--seed', type=int, default=DEFAULT_CORPUS_SEED, help='seed of corpus generator')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='number of runs, the best results are reported')
+    parser.add_argument('--output', help='file to save report into')
+    parser.add_argument('--compare', metavar='BASELINE', help='report of previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument('--workers', type=int, default=4, help='number of processes in gazetteer memory benchmark')
+    args = parser.parse_args(args)
+
+    report = benchmark_extraction(size=args.size, seed=args.seed, repeat=args.repeat)
+    report['gazetteer_memory'] = benchmark_gazetteer_memory(workers=args.workers)
+    json.dump(report, sys.stdout, indent=4, sort_keys=True)
+    print()
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=4, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = list(compare(report, baseline, threshold=args.threshold))
+        for path, expected, value in regressions:
+            print('Regression in {0}: {1:.3f} -> {2:.3f}'.format(path, expected, value), file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
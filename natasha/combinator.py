@@ -0,0 +1,333 @@
+from copy import deepcopy
+from threading import Lock
+from functools import partial
+from itertools import islice
+from contextlib import contextmanager
+
+from yargy import Combinator as DefaultCombinator
+from yargy.parser import Parser, Grammar, Operation
+
+from natasha.grammars import (
+    Person,
+    Location,
+    Address,
+    Money,
+    Date,
+    Brand,
+    Event,
+    Organisation,
+)
+from natasha.grammars.pipelines import (
+    CommercialOrganisationPipeline,
+    SocialOrganisationPipeline,
+    EducationalOrganisationPipeline,
+    AbbreviationalOrganisationPipeline,
+    PersonPositionPipeline,
+    MergedGazetteerPipeline,
+)
+from natasha.prefilter import Prefilter
+from natasha.profiler import Profiler
+from natasha.automaton import PrefixAutomaton, reset_state, is_initial
+from natasha.utils import read_segments, DEFAULT_CHUNK_SIZE
+from natasha.match import Match
+from natasha.morph import MorphCache, DEFAULT_MORPH_CACHE
+from natasha.serialization import normalize_tokens
+
+DEFAULT_GRAMMARS = [
+    Money,
+    Person,
+    Location,
+    Address,
+    Date,
+    Brand,
+    Event,
+    Organisation,
+]
+
+DEFAULT_PIPELINES = [
+    CommercialOrganisationPipeline,
+    SocialOrganisationPipeline,
+    EducationalOrganisationPipeline,
+    AbbreviationalOrganisationPipeline,
+    PersonPositionPipeline,
+]
+
+DEFAULT_BATCH_SIZE = 1000
+
+# characters after span of match, which are parsed when tokens of match are rebuilt:
+# repeatable rules are completed only by next token
+FIND_TOKENS_CONTEXT = 64
+
+
+def collect_labels(value, memo=None, seen=None):
+    '''
+    Returns dict, which maps id of each label in rules to label itself,
+    used as deepcopy memo, so copies of grammars share labels: labels are stateless
+    partials, state of grammar is kept in its stack and index
+    '''
+    if memo is None:
+        memo = {}
+        seen = set()
+    if isinstance(value, partial):
+        memo[id(value)] = value
+    elif isinstance(value, dict):
+        for item in value.values():
+            collect_labels(item, memo, seen)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            collect_labels(item, memo, seen)
+    elif id(value) not in seen and isinstance(value, (Operation, Grammar)):
+        seen.add(id(value))
+        collect_labels(vars(value), memo, seen)
+    return memo
+
+
+def copy_grammar(value, name):
+    '''
+    Same as yargy.parser.create_or_copy_grammar, but labels aren't copied
+    '''
+    memo = collect_labels(value)
+    if isinstance(value, list):
+        return Grammar(name, deepcopy(value, memo))
+    elif isinstance(value, (Operation, Grammar)):
+        return deepcopy(value, memo)
+    raise ValueError('Not supported grammar type: {}'.format(value))
+
+
+def shift_and_reduce(grammar, token):
+    grammar.shift(token)
+    return grammar.reduce()
+
+
+def reduce_end_of_stream(grammar):
+    return grammar.reduce(end_of_stream=True)
+
+
+class Combinator(DefaultCombinator):
+
+    '''
+    Modified version of yargy.Combinator with applied default pipelines,
+    which dictionaries are merged into single MergedGazetteerPipeline.
+    Grammars are copied without their labels, which makes construction faster.
+    With `prefilter` enabled, text is scanned before parsing and only grammars,
+    which required grammemes and dictionary lemmas present in text, are applied.
+    With `profile` enabled, calls, partial matches, matches and time of each grammar
+    are recorded, see `profile_report`.
+    With `share_prefixes` enabled, grammars built from the same rule lists (like
+    Address.AdjFull, Address.AdjFullWithHn and Address.AdjFullWithHnAndLetter) match
+    their common prefix once, see natasha.automaton (disabled in profile mode,
+    because time of each grammar can't be measured separately).
+    Morphological analysis of words is cached in `morph_cache`: by default in
+    natasha.morph.DEFAULT_MORPH_CACHE, shared by all combinators in process,
+    or in given MorphCache instance. Cache isn't used with False, or when tokenizer
+    has other morphological analyzer
+    '''
+
+    def __init__(self, classes, pipelines=None, prefilter=True, profile=False, share_prefixes=True,
+                 morph_cache=True, *args, **kwargs):
+        if pipelines is None:
+            pipelines = self.build_default_pipelines()
+        # same as yargy.Combinator.__init__, but with cheaper copies of grammars
+        self.classes = {}
+        self.grammars = []
+        for enum in classes:
+            for member in enum.__members__.values():
+                name = '{0}__{1}'.format(enum.__name__, member.name)
+                self.classes[name] = member
+                self.grammars.append(copy_grammar(member.value, name))
+        self.parser = Parser(self.grammars, pipelines=pipelines, *args, **kwargs)
+        if morph_cache is True:
+            morph_cache = DEFAULT_MORPH_CACHE
+        if isinstance(morph_cache, MorphCache) and self.parser.tokenizer.morph is morph_cache.analyzer:
+            self.parser.tokenizer.cache = morph_cache
+        else:
+            morph_cache = None
+        self.morph_cache = morph_cache
+        self.lock = Lock()
+        self.prefilter = Prefilter(self.grammars) if prefilter else None
+        self.profiler = Profiler(self.grammars) if profile else None
+        # prefix automata of grammars, selected by prefilter
+        self.automata = {} if share_prefixes and not profile else None
+
+    def build_default_pipelines(self):
+        pipelines = [
+            pipeline() for pipeline in DEFAULT_PIPELINES
+        ]
+        return [
+            MergedGazetteerPipeline(pipelines),
+        ]
+
+    def tokenize(self, text):
+        '''
+        Returns stream of tokens with applied pipelines
+        '''
+        return self.apply_pipelines(self.parser.tokenizer.transform(text))
+
+    def tokenize_segments(self, segments):
+        '''
+        Tokenizes (offset, text) segments into single stream,
+        positions of tokens are shifted by offset of their segment
+        '''
+        for offset, text in segments:
+            for token in self.parser.tokenizer.transform(text):
+                if offset:
+                    start, end = token.position
+                    token.position = (start + offset, end + offset)
+                yield token
+
+    def apply_pipelines(self, stream):
+        for pipeline in self.parser.pipelines:
+            stream = pipeline(stream)
+        return stream
+
+    def get_automaton(self, grammars):
+        key = tuple(id(grammar) for grammar in grammars)
+        automaton = self.automata.get(key)
+        if automaton is None:
+            automaton = self.automata[key] = PrefixAutomaton(grammars, self.classes)
+        return automaton
+
+    def parse(self, stream, grammars):
+        '''
+        Feeds tokens to grammars, yields (grammar, tokens) for each match
+        '''
+        if self.automata is not None:
+            automaton = self.get_automaton(grammars)
+            with self.lock:
+                for match in automaton.parse(stream):
+                    yield match
+            return
+        if self.profiler:
+            step, finish = self.profiler.step, self.profiler.finish
+        else:
+            step, finish = shift_and_reduce, reduce_end_of_stream
+        with self.lock:
+            for token in stream:
+                for grammar in grammars:
+                    match = step(grammar, token)
+                    if match:
+                        yield grammar, match.flatten()
+            for grammar in grammars:
+                match = finish(grammar)
+                if match:
+                    yield grammar, match.flatten()
+                reset_state(grammar)
+
+    def is_initial(self, grammars):
+        '''
+        Checks that grammars are in initial state, so tokens, which were fed to them
+        before, don't affect following matches. Can be called during parse, between tokens
+        '''
+        if self.automata is not None:
+            return self.get_automaton(grammars).is_initial()
+        return all(is_initial(grammar) for grammar in grammars)
+
+    def profile_report(self, limit=None, sort='time', as_json=False):
+        '''
+        Returns text table (or JSON) of grammars statistics, collected in profile mode
+        '''
+        if not self.profiler:
+            raise ValueError('Combinator was created without profile=True')
+        if as_json:
+            return self.profiler.to_json()
+        return self.profiler.report(limit=limit, sort=sort)
+
+    def extract(self, text):
+        stream = self.tokenize(text)
+        if self.prefilter:
+            stream = list(stream)
+            grammars = self.prefilter.select(stream)
+        else:
+            grammars = self.grammars
+        for grammar, match in self.parse(stream, grammars):
+            yield self.classes[grammar.name], match
+
+    def extract_compact(self, text):
+        '''
+        Same as extract, but yields compact Match objects with offsets of match in text
+        and normalized text instead of (grammar, tokens), tokens are rebuilt on demand.
+        Text is parsed before first match is yielded, so tokens can be rebuilt in loop
+        '''
+        for grammar, tokens in list(self.extract(text)):
+            yield Match(
+                grammar,
+                tokens[0].position[0],
+                tokens[-1].position[1],
+                normalize_tokens(tokens),
+                source=text,
+                combinator=self,
+            )
+
+    def find_tokens(self, grammar, text, start, end):
+        '''
+        Returns tokens of match of grammar, which spans text[start:end], by parsing
+        this span (and few following characters) again, positions of tokens are relative to text
+        '''
+        name = '{0}__{1}'.format(grammar.__class__.__name__, grammar.name)
+        grammars = [x for x in self.grammars if x.name == name]
+        stream = self.tokenize(text[start:end + FIND_TOKENS_CONTEXT])
+        # parsing is finished before search, so grammars are reset
+        for _, tokens in list(self.parse(stream, grammars)):
+            if tokens[0].position[0] == 0 and tokens[-1].position[1] == end - start:
+                for token in tokens:
+                    token.position = (token.position[0] + start, token.position[1] + start)
+                return tokens
+        return None
+
+    def extract_stream(self, source, chunk_size=DEFAULT_CHUNK_SIZE):
+        '''
+        Extracts matches from file-like object or iterable of strings without reading
+        it into memory: text is read by `chunk_size` characters and cut before words
+        (see `read_segments`), segments are tokenized separately, but fed to grammars as single stream of tokens,
+        so matches spanning several segments are found and positions of tokens are absolute.
+        Only tokens of partial matches are kept in grammars state between segments.
+        Prefilter isn't applied, because it requires whole text
+        '''
+        segments = read_segments(source, chunk_size=chunk_size)
+        stream = self.apply_pipelines(self.tokenize_segments(segments))
+        for grammar, match in self.parse(stream, self.grammars):
+            yield self.classes[grammar.name], match
+
+    def extract_many(self, texts, batch_size=DEFAULT_BATCH_SIZE):
+        '''
+        Extracts matches from multiple texts, yields (index, grammar, tokens) tuples,
+        where index is position of text in `texts` iterable.
+        Pipelines and grammars are shared between all texts, and word forms
+        are memoized for each batch of `batch_size` texts
+        '''
+        texts = iter(texts)
+        index = 0
+        while True:
+            batch = list(islice(texts, batch_size))
+            if not batch:
+                break
+            memo = {}
+            for text in batch:
+                # tokenizer is patched only while text is extracted, so it's restored
+                # even when iteration is abandoned
+                with self.memoized_word_forms(memo):
+                    matches = list(self.extract(text))
+                for grammar, tokens in matches:
+                    yield index, grammar, tokens
+                index += 1
+
+    @contextmanager
+    def memoized_word_forms(self, memo):
+        '''
+        Temporarily memoizes morphological analysis of words in tokenizer into `memo` dict
+        '''
+        tokenizer = self.parser.tokenizer
+        analyze = tokenizer.cache
+
+        def cache(word):
+            try:
+                return memo[word]
+            except KeyError:
+                forms = memo[word] = analyze(word)
+                return forms
+
+        tokenizer.cache = cache
+        try:
+            yield
+        finally:
+            tokenizer.cache = analyze
@@ -0,0 +1,74 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from yargy.compat import lru_cache
+
+
+DEFAULT_DISTANCE_CACHE_SIZE = 2 ** 16
+
+
+def bounded_damerau_levenshtein_distance(a, b, limit):
+    '''
+    Returns Damerau-Levenshtein distance between a and b (same as
+    yargy.interpretation.damerau_levenshtein_distance), when it isn't greater than limit,
+    otherwise returns limit + 1. Only cells within `limit` of diagonal are computed
+    (other cells can't be below limit), and computation stops as soon as
+    all cells of row are greater than limit, because next rows can't be smaller
+    '''
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) + len(b)
+    infinite = limit + 1
+    rows, columns = len(a), len(b)
+    # score[i + 1][j + 1] is distance between a[:i] and b[:j]
+    score = [[infinite] * (columns + 2) for _ in range(rows + 2)]
+    for i in range(rows + 1):
+        score[i + 1][1] = i
+    for j in range(columns + 1):
+        score[1][j + 1] = j
+    last_rows = {}
+    for i in range(1, rows + 1):
+        # transpositions with last match outside of band are greater than limit
+        last_column = 0
+        minimum = infinite
+        for j in range(max(1, i - limit), min(columns, i + limit) + 1):
+            i1 = last_rows.get(b[j - 1], 0)
+            j1 = last_column
+            cost = 1
+            if a[i - 1] == b[j - 1]:
+                cost = 0
+                last_column = j
+            value = min(
+                score[i][j] + cost,
+                score[i + 1][j] + 1,
+                score[i][j + 1] + 1,
+                score[i1][j1] + (i - i1 - 1) + 1 + (j - j1 - 1),
+                infinite,
+            )
+            score[i + 1][j + 1] = value
+            if value < minimum:
+                minimum = value
+        if minimum > limit:
+            return infinite
+        last_rows[a[i - 1]] = i
+    return score[rows + 1][columns + 1]
+
+
+@lru_cache(maxsize=DEFAULT_DISTANCE_CACHE_SIZE)
+def cached_bounded_distance(a, b, limit):
+    return bounded_damerau_levenshtein_distance(a, b, limit)
+
+
+def is_similar(a, b, threshold):
+    '''
+    Checks that Damerau-Levenshtein distance between a and b isn't greater than threshold,
+    results are memoized, because the same names are compared many times
+    '''
+    if abs(len(a) - len(b)) > threshold:
+        return False
+    if b < a:
+        a, b = b, a
+    return cached_bounded_distance(a, b, threshold) <= threshold
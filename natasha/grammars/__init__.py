@@ -1,7 +1,15 @@
-from natasha.grammars.person import Person, ProbabilisticPerson
-from natasha.grammars.location import Location, Address
-from natasha.grammars.money import Money
-from natasha.grammars.date import Date
-from natasha.grammars.brand import Brand
-from natasha.grammars.event import Event
-from natasha.grammars.organisation import Organisation, ProbabilisticOrganisation
+from natasha.utils import lazy_module
+
+
+lazy_module(__name__, {
+    'Person': 'natasha.grammars.person',
+    'ProbabilisticPerson': 'natasha.grammars.person',
+    'Location': 'natasha.grammars.location',
+    'Address': 'natasha.grammars.location',
+    'Money': 'natasha.grammars.money',
+    'Date': 'natasha.grammars.date',
+    'Brand': 'natasha.grammars.brand',
+    'Event': 'natasha.grammars.event',
+    'Organisation': 'natasha.grammars.organisation',
+    'ProbabilisticOrganisation': 'natasha.grammars.organisation',
+})
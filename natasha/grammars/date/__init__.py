@@ -0,0 +1,8 @@
+from natasha.utils import lazy_module
+from natasha.grammars.date.grammars import Date, MONTH_DICTIONARY, DAY_OF_WEEK_DICTIONARY
+
+# resolver is imported on first access
+lazy_module(__name__, {
+    'DateResolver': 'natasha.grammars.date.resolver',
+    'DateInterval': 'natasha.grammars.date.resolver',
+})
@@ -0,0 +1,290 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from calendar import monthrange
+from datetime import date, timedelta
+
+from natasha.grammars.date.grammars import Date
+
+
+MONTHS = {
+    'январь': 1,
+    'февраль': 2,
+    'март': 3,
+    'апрель': 4,
+    'май': 5,
+    'июнь': 6,
+    'июль': 7,
+    'август': 8,
+    'сентябрь': 9,
+    'октябрь': 10,
+    'ноябрь': 11,
+    'декабрь': 12,
+}
+
+DAYS_OF_WEEK = {
+    'понедельник': 0,
+    'вторник': 1,
+    'среда': 2,
+    'четверг': 3,
+    'пятница': 4,
+    'суббота': 5,
+    'воскресенье': 6,
+}
+
+# part of year (months) and part of month (days) for words of PARTIAL_DATE_DICTIONARY
+PARTS_OF_YEAR = {
+    'начало': (1, 4),
+    'середина': (5, 8),
+    'конец': (9, 12),
+}
+
+PARTS_OF_MONTH = {
+    'начало': (1, 10),
+    'середина': (11, 20),
+    'конец': (21, 31),
+}
+
+OFFSETS = {
+    'следующий': 1,
+    'прошлый': -1,
+}
+
+MONTH = 'month'
+DAY_OF_WEEK = 'day_of_week'
+PART = 'part'
+OFFSET = 'offset'
+
+
+def build_lookup_table():
+    '''
+    Returns dict, which maps lemma to (kind, value), so each form of token
+    is checked by single lookup
+    '''
+    table = {}
+    for kind, values in (
+        (MONTH, MONTHS),
+        (DAY_OF_WEEK, DAYS_OF_WEEK),
+        (PART, {word: word for word in PARTS_OF_YEAR}),
+        (OFFSET, OFFSETS),
+    ):
+        for word, value in values.items():
+            table[word] = (kind, value)
+    return table
+
+
+LOOKUP_TABLE = build_lookup_table()
+
+
+def get_range_bounds(value):
+    '''
+    Returns first and last numbers of range (range(18, 19) for '18-19'),
+    python 2 xrange has no start & stop attributes
+    '''
+    if not len(value):
+        return None
+    return value[0], value[-1] + 1
+
+
+def get_month_end(year, month):
+    return date(year, month, monthrange(year, month)[1])
+
+
+def shift_month(year, month, offset):
+    index = year * 12 + month - 1 + offset
+    return index // 12, index % 12 + 1
+
+
+class DateInterval(object):
+
+    '''
+    Interval of dates, both `start` and `end` are included
+    '''
+
+    __slots__ = (
+        'start',
+        'end',
+    )
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __contains__(self, value):
+        return self.start <= value <= self.end
+
+    def __eq__(self, other):
+        return isinstance(other, DateInterval) and (self.start, self.end) == (other.start, other.end)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((self.start, self.end))
+
+    def __repr__(self):
+        return 'DateInterval({0!r}, {1!r})'.format(self.start, self.end)
+
+
+class Values(object):
+
+    '''
+    Numbers, ranges and lemmas of match tokens, collected in one pass
+    '''
+
+    __slots__ = (
+        'numbers',
+        'ranges',
+        'month',
+        'day_of_week',
+        'part',
+        'offset',
+    )
+
+    def __init__(self, tokens):
+        self.numbers = []
+        self.ranges = []
+        self.month = self.day_of_week = self.part = self.offset = None
+        for token in tokens:
+            grammemes = token.forms[0]['grammemes']
+            if 'NUMBER' in grammemes:
+                self.numbers.append(token.value)
+                continue
+            if 'INT-RANGE' in grammemes:
+                self.ranges.append(token.value)
+                continue
+            for form in token.forms:
+                item = LOOKUP_TABLE.get(form['normal_form'])
+                if item:
+                    kind, value = item
+                    setattr(self, kind, value)
+                    break
+
+
+class DateResolver(object):
+
+    '''
+    Resolves matches of Date grammar to datetime.date (exact day)
+    or DateInterval (month, year, part of them or range of days) relative to
+    `reference` date (today by default):
+        '21 мая 1996 года' -> date(1996, 5, 21)
+        'в конце мая' -> DateInterval(date(Y, 5, 21), date(Y, 5, 31))
+        'в следующую пятницу' -> friday of next week
+    Offset months ('в прошлом январе') are the nearest such month before or after
+    current month. Matches, which aren't dates (like '1.5 года') are skipped
+    '''
+
+    def __init__(self, reference=None):
+        if reference is None:
+            reference = date.today()
+        self.reference = reference
+        self.year = reference.year
+        self.week_start = reference - timedelta(days=reference.weekday())
+        self.resolvers = {
+            Date.Full: self.resolve_full,
+            Date.FullWithDigits: self.resolve_full_with_digits,
+            Date.DayAndMonth: self.resolve_day_and_month,
+            Date.Year: self.resolve_year,
+            Date.PartialYearObject: self.resolve_partial_year,
+            Date.PartialMonthObject: self.resolve_partial_month,
+            Date.DayRange: self.resolve_day_range,
+            Date.YearRange: self.resolve_year_range,
+            Date.Month: self.resolve_month,
+            Date.DayOfWeek: self.resolve_day_of_week,
+            Date.MonthWithOffset: self.resolve_month_with_offset,
+            Date.DayOfWeekWithOffset: self.resolve_day_of_week_with_offset,
+            Date.CurrentMonthWithOffset: self.resolve_current_month_with_offset,
+        }
+
+    def resolve(self, grammar, tokens):
+        '''
+        Returns date or DateInterval of match, or None, when match isn't match of Date
+        grammar or doesn't point to existing date
+        '''
+        resolver = self.resolvers.get(grammar)
+        if resolver is None:
+            return None
+        try:
+            return resolver(Values(tokens))
+        except (ValueError, TypeError, IndexError, OverflowError):
+            # like 31 февраля, fractional or too large year
+            return None
+
+    def extract(self, matches):
+        '''
+        Takes (grammar, tokens) matches, like results of Combinator.extract,
+        and yields (grammar, tokens, value) for each resolved match of Date
+        '''
+        for grammar, tokens in matches:
+            value = self.resolve(grammar, tokens)
+            if value is not None:
+                yield grammar, tokens, value
+
+    def get_year(self, value):
+        if value != int(value):
+            raise ValueError('Fractional year: {0!r}'.format(value))
+        return int(value)
+
+    def get_month(self, month, year=None):
+        if year is None:
+            year = self.year
+        return DateInterval(date(year, month, 1), get_month_end(year, month))
+
+    def get_year_interval(self, start, end):
+        return DateInterval(date(start, 1, 1), date(end, 12, 31))
+
+    def resolve_full(self, values):
+        day, year = values.numbers
+        return date(self.get_year(year), values.month, day)
+
+    def resolve_full_with_digits(self, values):
+        day, month, year = values.numbers
+        return date(self.get_year(year), month, day)
+
+    def resolve_day_and_month(self, values):
+        day, = values.numbers
+        return date(self.year, values.month, day)
+
+    def resolve_year(self, values):
+        year = self.get_year(values.numbers[0])
+        return self.get_year_interval(year, year)
+
+    def resolve_partial_year(self, values):
+        year = self.get_year(values.numbers[0])
+        start, end = PARTS_OF_YEAR[values.part]
+        return DateInterval(date(year, start, 1), get_month_end(year, end))
+
+    def resolve_partial_month(self, values):
+        start, end = PARTS_OF_MONTH[values.part]
+        month = self.get_month(values.month)
+        return DateInterval(month.start.replace(day=start), month.end.replace(day=min(end, month.end.day)))
+
+    def resolve_day_range(self, values):
+        start, end = get_range_bounds(values.ranges[0])
+        return DateInterval(date(self.year, values.month, start), date(self.year, values.month, end))
+
+    def resolve_year_range(self, values):
+        start, end = get_range_bounds(values.ranges[0])
+        return self.get_year_interval(start, end)
+
+    def resolve_month(self, values):
+        return self.get_month(values.month)
+
+    def resolve_day_of_week(self, values):
+        return self.week_start + timedelta(days=values.day_of_week)
+
+    def resolve_month_with_offset(self, values):
+        month = values.month
+        current = self.reference.month
+        if values.offset > 0:
+            year = self.year if month > current else self.year + 1
+        else:
+            year = self.year if month < current else self.year - 1
+        return self.get_month(month, year)
+
+    def resolve_day_of_week_with_offset(self, values):
+        return self.week_start + timedelta(days=values.offset * 7 + values.day_of_week)
+
+    def resolve_current_month_with_offset(self, values):
+        year, month = shift_month(self.year, self.reference.month, values.offset)
+        return self.get_month(month, year)
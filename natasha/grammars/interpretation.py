@@ -0,0 +1,104 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from functools import wraps
+
+from yargy.interpretation import InterpretationObject as BaseInterpretationObject
+
+
+def cached_property(method):
+    '''
+    Property, which value is computed on first access and stored
+    in `_cache` dict of object until object is changed
+    '''
+    name = method.__name__
+
+    @wraps(method)
+    def getter(self):
+        try:
+            cache = self._cache
+        except AttributeError:
+            cache = {}
+            object.__setattr__(self, '_cache', cache)
+        try:
+            return cache[name]
+        except KeyError:
+            value = cache[name] = method(self)
+            return value
+
+    return property(getter)
+
+
+class InterpretationObject(object):
+
+    '''
+    Version of yargy.interpretation.InterpretationObject, which stores attributes in slots
+    instead of __dict__ (subclasses declare slots of their attributes), so millions of objects
+    in coreference resolution take less memory. yargy class has no slots, so it isn't
+    subclassed (otherwise instances would have __dict__ anyway), its methods are reused instead.
+    Values of `cached_property` properties (normalized attributes, gender, abbreviations)
+    are computed once, cache is dropped when any attribute is set or by `invalidate`
+    '''
+
+    Attributes = None
+
+    SIMILARITY_THRESHOLD = BaseInterpretationObject.SIMILARITY_THRESHOLD
+
+    __slots__ = (
+        'spans',
+        '_cache',
+    )
+
+    def __init__(self, **kwargs):
+        for key in self.Attributes.__members__.keys():
+            # set default values for object attributes
+            setattr(self, key.lower(), None)
+        self.spans = None
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __setattr__(self, name, value):
+        super(InterpretationObject, self).__setattr__(name, value)
+        self.invalidate()
+
+    def invalidate(self):
+        try:
+            object.__delattr__(self, '_cache')
+        except AttributeError:
+            pass
+
+    @classmethod
+    def get_fields(cls):
+        '''
+        Returns names of slots of object attributes, in order of subclass declarations
+        '''
+        fields = []
+        for klass in cls.__mro__:
+            for name in klass.__dict__.get('__slots__', ()):
+                if name != '_cache':
+                    fields.append(name)
+        return fields
+
+    def __iter__(self):
+        for name in self.get_fields():
+            yield name, getattr(self, name)
+
+    def __repr__(self):
+        return '{cls}({attrs})'.format(
+            cls=self.__class__.__name__,
+            attrs=dict(self),
+        )
+
+    def __getstate__(self):
+        return dict(self)
+
+    def __setstate__(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    abbr = cached_property(BaseInterpretationObject.abbr.fget)
+    normalized = cached_property(BaseInterpretationObject.normalized.fget)
+
+    # functions from class dict, because unbound methods of python 2 check type of self
+    difference = BaseInterpretationObject.__dict__['difference']
+    __eq__ = BaseInterpretationObject.__dict__['__eq__']
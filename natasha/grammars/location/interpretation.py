@@ -4,10 +4,9 @@ from __future__ import unicode_literals
 from enum import Enum
 
 from yargy.normalization import get_normalized_text
-from yargy.interpretation import (
-    InterpretationObject,
-    damerau_levenshtein_distance,
-)
+from yargy.interpretation import damerau_levenshtein_distance
+
+from natasha.grammars.interpretation import InterpretationObject
 
 
 class LocationObject(InterpretationObject):
@@ -17,6 +16,11 @@ class LocationObject(InterpretationObject):
         Name = 0 # российская
         Descriptor = 1 # федерация
 
+    __slots__ = (
+        'name',
+        'descriptor',
+    )
+
 class AddressObject(InterpretationObject):
 
     class Attributes(Enum):
@@ -27,3 +31,11 @@ class AddressObject(InterpretationObject):
         House_Number_Descriptor = 2
         House_Number_Letter = 3
         House_Number = 4
+
+    __slots__ = (
+        'street_descriptor',
+        'street_name',
+        'house_number_descriptor',
+        'house_number_letter',
+        'house_number',
+    )
@@ -21,6 +21,11 @@ class LocationTestCase(BaseTestCase):
         self.assertEqual(
             ['северо-западный', 'федеральный', 'округ'], [x.value for x in match])
 
+    def test_district_agreement(self):
+        # adjectives and noun don't agree in gender
+        self.assertEqual(list(self.combinator.extract('Центральная федеральная округа')), [])
+        self.assertEqual(list(self.combinator.extract('Ханты-Мансийская автономная округа')), [])
+
     def test_autonomous_district(self):
         grammar, match = list(
             self.combinator.extract('Ямало-Ненецкого автономного округа'))[0]
@@ -788,3 +793,14 @@ class LocationInterpretationTestCase(BaseTestCase):
         self.assertEqual(len(objects), 1)
         self.assertEqual([t.value for t in objects[0].name], ['Нижний', 'Новгород'])
         self.assertEqual(objects[0].descriptor, None)
+
+    def test_slots(self):
+        matches = self.combinator.resolve_matches(
+            self.combinator.extract('Москва и Москва')
+        )
+        first, second = self.engine.extract(matches)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertEqual(dict(first)['name'], first.name)
+        with self.assertRaises(AttributeError):
+            first.population = 12000000
+        self.assertEqual(first, second)
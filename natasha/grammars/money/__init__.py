@@ -0,0 +1,7 @@
+from natasha.utils import lazy_module
+from natasha.grammars.money.grammars import Money, PREFIX_DICTIONARY, CURRENCY_DICTIONARY
+
+# interpretation is imported on first access
+lazy_module(__name__, {
+    'MoneyInterpretation': 'natasha.grammars.money.interpretation',
+})
@@ -0,0 +1,165 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from decimal import Decimal
+
+from yargy.compat import string_type
+
+from natasha.grammars.money.grammars import Money
+
+
+NUMERALS = {
+    'ноль': 0,
+    'нуль': 0,
+    'один': 1,
+    'полтора': Decimal('1.5'),
+    'два': 2,
+    'три': 3,
+    'четыре': 4,
+    'пять': 5,
+    'шесть': 6,
+    'семь': 7,
+    'восемь': 8,
+    'девять': 9,
+    'десять': 10,
+    'одиннадцать': 11,
+    'двенадцать': 12,
+    'тринадцать': 13,
+    'четырнадцать': 14,
+    'пятнадцать': 15,
+    'шестнадцать': 16,
+    'семнадцать': 17,
+    'восемнадцать': 18,
+    'девятнадцать': 19,
+    'двадцать': 20,
+    'тридцать': 30,
+    'сорок': 40,
+    'пятьдесят': 50,
+    'шестьдесят': 60,
+    'семьдесят': 70,
+    'восемьдесят': 80,
+    'девяносто': 90,
+    'сто': 100,
+    'полтораста': 150,
+    'двести': 200,
+    'триста': 300,
+    'четыреста': 400,
+    'пятьсот': 500,
+    'шестьсот': 600,
+    'семьсот': 700,
+    'восемьсот': 800,
+    'девятьсот': 900,
+}
+
+# multipliers of words from PREFIX_DICTIONARY
+PREFIX_MULTIPLIERS = {
+    'тысяча': 10 ** 3,
+    'миллион': 10 ** 6,
+    'миллиард': 10 ** 9,
+    'триллион': 10 ** 12,
+}
+
+PREFIX_ABBREVIATIONS = {
+    'тыс': 'тысяча',
+    'млн': 'миллион',
+    'млрд': 'миллиард',
+    'трлн': 'триллион',
+}
+
+CURRENCY_CODES = {
+    'рубль': 'RUB',
+    'руб': 'RUB',
+    'доллар': 'USD',
+    'долл': 'USD',
+    'евро': 'EUR',
+}
+
+NUMERAL = 'numeral'
+MULTIPLIER = 'multiplier'
+CURRENCY = 'currency'
+
+
+def build_lookup_table(numerals, multipliers, abbreviations, currencies):
+    '''
+    Returns dict, which maps normal form (or abbreviation) of word to (kind, value),
+    so each form of token is checked by single lookup
+    '''
+    table = {}
+    for word, value in numerals.items():
+        table[word] = (NUMERAL, Decimal(value))
+    for word, value in multipliers.items():
+        table[word] = (MULTIPLIER, Decimal(value))
+    for abbreviation, word in abbreviations.items():
+        table[abbreviation] = table[word]
+    for word, code in currencies.items():
+        table[word] = (CURRENCY, code)
+    return table
+
+
+class MoneyInterpretation(object):
+
+    '''
+    Converts matches of Money grammar into (amount, currency) pairs, where amount is
+    Decimal and currency is ISO 4217 code:
+        ['семьдесят', 'пять', 'тысяч', 'рублей'] -> (Decimal('75000'), 'RUB')
+        [1.2, 'млрд', '.', 'долларов'] -> (Decimal('1200000000.0'), 'USD')
+    Numerals are summed up, number is multiplied by prefix ('миллион', 'млн')
+    and match without number (like 'миллион долларов') is interpreted as one prefix
+    '''
+
+    def __init__(self, numerals=NUMERALS, multipliers=PREFIX_MULTIPLIERS,
+                 abbreviations=PREFIX_ABBREVIATIONS, currencies=CURRENCY_CODES):
+        self.table = build_lookup_table(numerals, multipliers, abbreviations, currencies)
+
+    def lookup(self, token):
+        for form in token.forms:
+            item = self.table.get(form['normal_form'])
+            if item:
+                return item
+        if isinstance(token.value, string_type):
+            return self.table.get(token.value.lower())
+        return None
+
+    def interpret(self, grammar, tokens):
+        '''
+        Returns (amount, currency) pair of match, or None, when match isn't
+        match of Money grammar or some of its parts are unknown
+        '''
+        if not isinstance(grammar, Money):
+            return None
+        number = None
+        multiplier = None
+        currency = None
+        for token in tokens:
+            if 'NUMBER' in token.forms[0]['grammemes']:
+                value = token.value
+                number = Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+                continue
+            item = self.lookup(token)
+            if item is None:
+                continue
+            kind, value = item
+            if kind == NUMERAL:
+                number = value if number is None else number + value
+            elif kind == MULTIPLIER:
+                multiplier = value
+            else:
+                currency = value
+        if currency is None or (number is None and multiplier is None):
+            return None
+        if number is None:
+            return multiplier, currency
+        if multiplier is not None:
+            number *= multiplier
+        return number, currency
+
+    def extract(self, matches):
+        '''
+        Takes (grammar, tokens) matches, like results of Combinator.extract,
+        and yields (grammar, tokens, (amount, currency)) for each interpreted match of Money
+        '''
+        for grammar, tokens in matches:
+            value = self.interpret(grammar, tokens)
+            if value is not None:
+                yield grammar, tokens, value
+
@@ -1,2 +1,3 @@
 from natasha.grammars.organisation.grammars import Organisation, ProbabilisticOrganisation
 from natasha.grammars.organisation.interpretation import OrganisationObject
+from natasha.grammars.organisation.index import OrganisationIndex
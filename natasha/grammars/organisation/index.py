@@ -0,0 +1,159 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from natasha.utils import DisjointSet
+from natasha.grammars.organisation.interpretation import OrganisationObject
+
+
+DEFAULT_NGRAM_SIZE = 3
+
+
+def get_ngrams(text, size):
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+
+def get_substrings(text, size):
+    '''
+    Returns all substrings of text shorter than `size`
+    '''
+    return {
+        text[start:start + length]
+        for length in range(1, size)
+        for start in range(len(text) - length + 1)
+    }
+
+
+def get_deletions(text, depth):
+    '''
+    Returns variants of text with up to `depth` deleted characters
+    '''
+    variants = {text}
+    for _ in range(depth):
+        variants |= {
+            variant[:index] + variant[index + 1:]
+            for variant in variants
+            for index in range(len(variant))
+        }
+    return variants
+
+
+class OrganisationIndex(object):
+
+    '''
+    Blocking index for deduplication of OrganisationObject mentions: objects are
+    put into buckets by keys of their normalized names, and OrganisationObject.__eq__
+    is called only for candidates, found by buckets. Candidates include every pair,
+    which can be equal:
+        - objects with common abbreviation
+        - objects, which names share all n-grams of one of names (substrings)
+          or all n-grams except 2 * SIMILARITY_THRESHOLD * n (Damerau-Levenshtein
+          distance below threshold, each edit breaks at most 2n n-grams)
+        - objects with short names (where previous rule gives nothing),
+          which variants with up to SIMILARITY_THRESHOLD deleted characters intersect
+        - names shorter than n-gram are looked up among substrings of other names
+    '''
+
+    def __init__(self, objects=(), object_class=OrganisationObject, ngram_size=DEFAULT_NGRAM_SIZE):
+        self.ngram_size = ngram_size
+        self.threshold = object_class.SIMILARITY_THRESHOLD
+        # number of distinct n-grams, which can be broken by edits within threshold
+        self.broken_ngrams = 2 * self.threshold * ngram_size
+        self.objects = []
+        self.ngrams_counts = []
+        self.ngrams = {}
+        self.buckets = {}
+        # short names and substrings of all names, that are shorter than n-gram
+        self.short_names = {}
+        self.substrings = {}
+        for obj in objects:
+            self.add(obj)
+
+    def __len__(self):
+        return len(self.objects)
+
+    def get_keys(self, obj, ngrams):
+        keys = {('abbr', abbr) for abbr in obj.abbr}
+        if len(ngrams) <= self.broken_ngrams:
+            name = obj.normalized_name
+            keys.update(('deletion', variant) for variant in get_deletions(name, self.threshold))
+        return keys
+
+    def add(self, obj):
+        '''
+        Adds object to index, returns its position.
+        Objects without name are never equal to others, so they aren't put into buckets
+        '''
+        position = len(self.objects)
+        self.objects.append(obj)
+        name = obj.normalized_name
+        ngrams = get_ngrams(name, self.ngram_size) if name else set()
+        self.ngrams_counts.append(len(ngrams))
+        if not name:
+            return position
+        for ngram in ngrams:
+            self.ngrams.setdefault(ngram, []).append(position)
+        for key in self.get_keys(obj, ngrams):
+            self.buckets.setdefault(key, []).append(position)
+        if len(name) < self.ngram_size:
+            self.short_names.setdefault(name, []).append(position)
+        for substring in get_substrings(name, self.ngram_size):
+            self.substrings.setdefault(substring, []).append(position)
+        return position
+
+    def get_candidates(self, obj):
+        '''
+        Returns set of positions of objects, which can be equal to given object
+        '''
+        name = obj.normalized_name
+        candidates = set()
+        if not name:
+            return candidates
+        ngrams = get_ngrams(name, self.ngram_size)
+        shared = {}
+        for ngram in ngrams:
+            for position in self.ngrams.get(ngram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        for position, count in shared.items():
+            other = self.ngrams_counts[position]
+            # pairs of short names, which n-grams can be all broken, are found by deletions
+            limit = max(len(ngrams), other) - self.broken_ngrams
+            if count >= min(len(ngrams), other) or 0 < limit <= count:
+                candidates.add(position)
+        for key in self.get_keys(obj, ngrams):
+            candidates.update(self.buckets.get(key, ()))
+        if len(name) < self.ngram_size:
+            candidates.update(self.substrings.get(name, ()))
+        for substring in get_substrings(name, self.ngram_size):
+            candidates.update(self.short_names.get(substring, ()))
+        return candidates
+
+    def find_similar(self, obj):
+        '''
+        Returns sorted positions of objects equal to given object (except object itself)
+        '''
+        return [
+            position for position in sorted(self.get_candidates(obj))
+            if self.objects[position] is not obj and self.objects[position] == obj
+        ]
+
+    def pairs(self):
+        '''
+        Yields (i, j) positions of equal objects (i < j)
+        '''
+        for position, obj in enumerate(self.objects):
+            for candidate in sorted(self.get_candidates(obj)):
+                if candidate < position and self.objects[candidate] == obj:
+                    yield candidate, position
+
+    def clusters(self):
+        '''
+        Returns list of clusters (lists of positions of objects), ordered by first mention.
+        Clusters are connected components of pairs of equal objects
+        '''
+        components = DisjointSet(len(self.objects))
+        for a, b in self.pairs():
+            components.union(a, b)
+        clusters = {}
+        for position in range(len(self.objects)):
+            clusters.setdefault(components.find(position), []).append(position)
+        return sorted(clusters.values())
@@ -4,10 +4,9 @@ from __future__ import unicode_literals
 from enum import Enum
 
 from yargy.normalization import get_normalized_text
-from yargy.interpretation import (
-    InterpretationObject,
-    damerau_levenshtein_distance,
-)
+
+from natasha.distance import bounded_damerau_levenshtein_distance, is_similar
+from natasha.grammars.interpretation import InterpretationObject, cached_property
 
 
 class OrganisationObject(InterpretationObject):
@@ -17,7 +16,12 @@ class OrganisationObject(InterpretationObject):
         Name = 0 # кировский
         Descriptor = 1 # завод
 
-    @property
+    __slots__ = (
+        'name',
+        'descriptor',
+    )
+
+    @cached_property
     def normalized_name(self):
         if self.name:
             return get_normalized_text(
@@ -26,7 +30,7 @@ class OrganisationObject(InterpretationObject):
         else:
             return None
 
-    @property
+    @cached_property
     def normalized_descriptor(self):
         if self.descriptor:
             return get_normalized_text(
@@ -35,11 +39,15 @@ class OrganisationObject(InterpretationObject):
         else:
             return None
 
-    def normalized_name_difference(self, another):
-        return damerau_levenshtein_distance(
-            self.normalized_name,
-            another.normalized_name,
-        )
+    def normalized_name_difference(self, another, limit=None):
+        '''
+        Returns Damerau-Levenshtein distance between normalized names,
+        with `limit` distance is computed only up to limit + 1
+        '''
+        a, b = self.normalized_name, another.normalized_name
+        if limit is None:
+            limit = max(len(a), len(b))
+        return bounded_damerau_levenshtein_distance(a, b, limit)
 
     def __eq__(self, another):
         if self.normalized_name and another.normalized_name:
@@ -50,6 +58,6 @@ class OrganisationObject(InterpretationObject):
                 return True
             if self.abbr & another.abbr:
                 return True
-            if self.normalized_name_difference(another) <= self.SIMILARITY_THRESHOLD:
+            if is_similar(a, b, self.SIMILARITY_THRESHOLD):
                 return True
         return False
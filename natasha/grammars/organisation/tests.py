@@ -5,7 +5,7 @@ from __future__ import unicode_literals
 import natasha
 
 from natasha.tests import BaseTestCase
-from natasha.grammars.organisation import OrganisationObject
+from natasha.grammars.organisation import OrganisationObject, OrganisationIndex
 
 from yargy.normalization import get_normalized_text
 from yargy.interpretation import InterpretationEngine
@@ -188,3 +188,53 @@ class OrganisationInterpretationTestCase(BaseTestCase):
         self.assertEqual(objects[1].abbr, {'фсб'})
 
         self.assertEqual(objects[0], objects[1])
+
+    def test_cached_attributes(self):
+        matches = self.combinator.resolve_matches(
+            self.combinator.extract('ООО "Рога и копыта"')
+        )
+        objects = list(
+            self.engine.extract(matches)
+        )
+        self.assertEqual(len(objects), 1)
+        organisation = objects[0]
+        self.assertEqual(organisation.normalized_name, 'рога и копыта')
+        self.assertIs(organisation.abbr, organisation.abbr)
+
+        organisation.name = None
+        self.assertEqual(organisation.normalized_name, None)
+        organisation.invalidate()
+        self.assertEqual(organisation.normalized_descriptor, 'ооо')
+
+
+class OrganisationIndexTestCase(BaseTestCase):
+
+    def setUp(self):
+        self.engine = InterpretationEngine(OrganisationObject)
+        super(OrganisationIndexTestCase, self).setUp()
+
+    def test_clusters(self):
+        text = (
+            'ооо "Рога и КаПыта" или общество "рога и копыто". '
+            'федеральная служба безопасности (сокращенно, ФСБ). '
+            'Санкт-Петербургский государственный университет'
+        )
+        objects = list(
+            self.engine.extract(
+                self.combinator.resolve_matches(
+                    self.combinator.extract(text)
+                )
+            )
+        )
+        index = OrganisationIndex(objects)
+        self.assertEqual(len(index), len(objects))
+
+        expected = [
+            (i, j)
+            for i in range(len(objects))
+            for j in range(i + 1, len(objects))
+            if objects[i] == objects[j]
+        ]
+        self.assertEqual(sorted(index.pairs()), expected)
+        self.assertEqual(index.clusters(), [[0, 1], [2, 4], [3]])
+        self.assertEqual(index.find_similar(objects[0]), [1])
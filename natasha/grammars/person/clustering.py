@@ -0,0 +1,295 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from itertools import product
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from yargy.tokenizer import Token
+from yargy.normalization import get_normalized_text
+
+from natasha.utils import DisjointSet
+from natasha.distance import is_similar
+from natasha.grammars.person.interpretation import PersonObject
+
+
+DEFAULT_BLOCK_PREFIX_LENGTH = 3
+
+NAME_FIELDS = (
+    'firstname',
+    'middlename',
+    'lastname',
+)
+
+# fields used for blocking of candidate pairs, in order of priority
+BLOCKING_FIELDS = (
+    'lastname',
+    'firstname',
+    'middlename',
+)
+
+# codes of names comparison, same order as in PersonObject.similarity_check
+NEUTRAL, POSITIVE, NEGATIVE = 0, 1, 2
+
+# codes of gender & descriptor comparison
+UNKNOWN, DIFFERENT, SAME = 0, 1, 2
+
+FEATURES_COUNT = 5
+
+
+class PersonClusterer(object):
+
+    '''
+    Coreference resolution of PersonObject mentions: unlike pairwise comparison
+    with PersonObject.similarity, normalized names, genders and descriptors
+    are computed once per mention and encoded into matrix of ids, so candidate pairs
+    are scored in batches by NumPy with same coefficients. Candidate pairs are blocked
+    by first `prefix_length` letters of lastname, mentions without lastname are
+    blocked by firstname (and then by middlename), initials are blocked with all names,
+    which start with them. Mentions are clustered by connected components of pairs,
+    which are similar by PersonObject.__eq__ rules.
+
+    Clusters approximate connected components of all pairs: pairs from different blocks
+    are never compared, though some of them are similar, like mentions with different
+    lastnames, but similar firstnames (any two initials are similar) and same gender
+    ('И. Петров' and 'В. Путин'), or mentions without common names
+    '''
+
+    def __init__(self, object_class=PersonObject, prefix_length=DEFAULT_BLOCK_PREFIX_LENGTH):
+        if np is None:
+            raise ImportError('PersonClusterer requires numpy, install it with `pip install natasha[clustering]`')
+        self.object_class = object_class
+        self.prefix_length = prefix_length
+        self.threshold = object_class.SIMILARITY_THRESHOLD
+        self.scores = self.build_scores_table()
+        self.normalized = {}
+
+    def build_scores_table(self):
+        '''
+        Returns array of similarity values for each combination of comparison codes,
+        values are computed the same way as in PersonObject.similarity
+        '''
+        cls = self.object_class
+        names = (cls.NEUTRAL_COEF, cls.POSITIVE_COEF, cls.NEGATIVE_COEF)
+        scores = []
+        for codes in product(range(3), repeat=FEATURES_COUNT):
+            coefficients = [names[code][index] for index, code in enumerate(codes[:3])]
+            gender, descriptor = codes[3:]
+            coefficients.append(0 if gender == UNKNOWN else cls.GENDER_COEF[gender == SAME])
+            coefficients.append(0 if descriptor == UNKNOWN else cls.DESCRIPTOR_COEF[descriptor == SAME])
+            scores.append(round(sum(coefficients), 2))
+        return np.array(scores)
+
+    def compare_names(self, a, b):
+        if b > a:
+            a, b = b, a
+        if a.startswith(b):
+            return POSITIVE
+        if self.is_similar(a, b):
+            return POSITIVE
+        return NEGATIVE
+
+    def compare_descriptors(self, a, b):
+        return SAME if self.is_similar(a, b) else DIFFERENT
+
+    def is_similar(self, a, b):
+        return is_similar(a, b, self.threshold)
+
+    def normalize(self, value):
+        '''
+        Same as normalized_* properties of PersonObject, but inflection of tokens is memoized,
+        because the same names are mentioned many times
+        '''
+        if not value:
+            return None
+        if isinstance(value, Token):
+            value = [value]
+        words = []
+        for token in value:
+            form = token.forms[0]
+            key = (
+                token.value,
+                token.normalization_type,
+                form['normal_form'],
+                frozenset(form['grammemes']),
+                form.get('methods_stack'),
+            )
+            try:
+                word = self.normalized[key]
+            except KeyError:
+                word = self.normalized[key] = get_normalized_text(token)
+            words.append(word)
+        return ' '.join(words).lower() or None
+
+    def get_features(self, objects):
+        '''
+        Returns matrix of ids of normalized firstname, middlename, lastname, gender
+        and descriptor of each object (-1 for missing values) and list of vocabularies
+        '''
+        columns = [
+            [self.normalize(getattr(x, field)) for x in objects]
+            for field in NAME_FIELDS
+        ]
+        columns.append([x.most_common_gender for x in objects])
+        columns.append([self.normalize(x.descriptor) for x in objects])
+        features = np.full((len(objects), FEATURES_COUNT), -1, dtype=np.int64)
+        vocabularies = []
+        for index, column in enumerate(columns):
+            vocabulary = {}
+            for row, value in enumerate(column):
+                if value is not None:
+                    features[row, index] = vocabulary.setdefault(value, len(vocabulary))
+            vocabularies.append(sorted(vocabulary, key=vocabulary.get))
+        return features, vocabularies
+
+    def get_candidate_pairs(self, features, vocabularies):
+        '''
+        Returns arrays of row indexes (i < j) of pairs from same blocks
+        '''
+        size = len(features)
+        blocked = np.zeros(size, dtype=bool)
+        heads, tails = [], []
+        for field in BLOCKING_FIELDS:
+            index = NAME_FIELDS.index(field)
+            column = features[:, index]
+            present = column >= 0
+            primary = present & ~blocked
+            vocabulary = vocabularies[index]
+            rows = np.nonzero(present)[0]
+            if len(rows) < 2 or not primary.any():
+                blocked |= present
+                continue
+            rows, blocks = self.get_blocks(rows, column[rows], vocabulary)
+            order = np.argsort(blocks, kind='mergesort')
+            rows, blocks = rows[order], blocks[order]
+            bounds = np.nonzero(np.diff(blocks))[0] + 1
+            for members in np.split(rows, bounds):
+                if len(members) < 2 or not primary[members].any():
+                    continue
+                i, j = np.triu_indices(len(members), 1)
+                i, j = members[i], members[j]
+                mask = primary[i] | primary[j]
+                heads.append(i[mask])
+                tails.append(j[mask])
+            blocked |= present
+        if not heads:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+        # initials are in multiple blocks, so same pair can be found more than once
+        keys = np.unique(np.concatenate(heads) * size + np.concatenate(tails))
+        return keys // size, keys % size
+
+    def get_blocks(self, rows, ids, vocabulary):
+        '''
+        Returns arrays of rows and ids of their blocks, ids of blocks are ids of first
+        `prefix_length` letters of values. Values shorter than prefix (initials)
+        are put into blocks of all prefixes, which start with them, too
+        '''
+        prefixes = {}
+        keys = [
+            prefixes.setdefault(value[:self.prefix_length], len(prefixes)) for value in vocabulary
+        ]
+        blocks = [[key] for key in keys]
+        for value, key in zip(vocabulary, keys):
+            if len(value) < self.prefix_length:
+                blocks[key] = [
+                    other for prefix, other in prefixes.items() if prefix.startswith(value)
+                ]
+        counts = np.array([len(blocks[key]) for key in keys], dtype=np.int64)[ids]
+        return np.repeat(rows, counts), np.array([
+            block for id in ids.tolist() for block in blocks[keys[id]]
+        ], dtype=np.int64)
+
+    def compare_column(self, a, b, vocabulary, compare):
+        '''
+        Returns comparison codes of pairs of ids, each unique pair of values is compared once
+        '''
+        codes = np.zeros(len(a), dtype=np.int64)
+        known = (a >= 0) & (b >= 0)
+        if not known.any():
+            return codes
+        size = len(vocabulary)
+        low = np.minimum(a[known], b[known])
+        high = np.maximum(a[known], b[known])
+        keys, inverse = np.unique(low * size + high, return_inverse=True)
+        results = np.array([
+            compare(vocabulary[key // size], vocabulary[key % size]) for key in keys.tolist()
+        ], dtype=np.int64)
+        codes[known] = results[inverse.reshape(-1)]
+        return codes
+
+    def score(self, features, vocabularies, i, j):
+        '''
+        Returns similarity of rows pairs, same as PersonObject.similarity
+        '''
+        index = np.zeros(len(i), dtype=np.int64)
+        for column in range(FEATURES_COUNT):
+            a, b = features[i, column], features[j, column]
+            if column < len(NAME_FIELDS):
+                codes = self.compare_column(a, b, vocabularies[column], self.compare_names)
+            elif column == len(NAME_FIELDS):
+                codes = np.where((a >= 0) & (b >= 0), np.where(a == b, SAME, DIFFERENT), UNKNOWN)
+            else:
+                codes = self.compare_column(a, b, vocabularies[column], self.compare_descriptors)
+            index = index * 3 + codes
+        return self.scores[index]
+
+    def get_similar_rows(self, features, vocabularies):
+        '''
+        Returns unique feature rows, mapping of objects to rows, similar pairs of rows
+        and mask of rows, which objects are similar to each other
+        '''
+        rows, inverse = np.unique(features, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        threshold = self.object_class.MINIMUM_SIMILARITY_COEFFICIENT
+        diagonal = np.arange(len(rows))
+        self_similar = self.score(rows, vocabularies, diagonal, diagonal) >= threshold
+        # objects without names aren't blocked, so they are never compared
+        self_similar &= (rows[:, :len(NAME_FIELDS)] >= 0).any(axis=1)
+        i, j = self.get_candidate_pairs(rows, vocabularies)
+        similar = self.score(rows, vocabularies, i, j) >= threshold
+        return rows, inverse, i[similar], j[similar], self_similar
+
+    def pairs(self, objects):
+        '''
+        Yields (i, j, similarity) for each candidate pair of objects (i < j)
+        '''
+        features, vocabularies = self.get_features(objects)
+        i, j = self.get_candidate_pairs(features, vocabularies)
+        for a, b, score in zip(i.tolist(), j.tolist(), self.score(features, vocabularies, i, j).tolist()):
+            yield a, b, score
+
+    def clusters(self, objects):
+        '''
+        Returns list of clusters (lists of indexes of objects), ordered by first mention
+        '''
+        if not objects:
+            return []
+        features, vocabularies = self.get_features(objects)
+        rows, inverse, i, j, self_similar = self.get_similar_rows(features, vocabularies)
+        linked = self_similar.copy()
+        linked[i] = True
+        linked[j] = True
+        components = DisjointSet(len(rows))
+        for a, b in zip(i.tolist(), j.tolist()):
+            components.union(a, b)
+        clusters = {}
+        for index, row in enumerate(inverse.tolist()):
+            key = ('row', components.find(row)) if linked[row] else ('object', index)
+            clusters.setdefault(key, []).append(index)
+        return sorted(clusters.values())
+
+    def merge(self, objects):
+        '''
+        Returns list of objects, merged by clusters
+        '''
+        merged = []
+        for cluster in self.clusters(objects):
+            result = objects[cluster[0]]
+            for index in cluster[1:]:
+                result = result.merge(objects[index])
+            merged.append(result)
+        return merged
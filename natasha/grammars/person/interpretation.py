@@ -7,11 +7,10 @@ from collections import Counter
 
 from yargy.tokenizer import Token
 from yargy.normalization import get_normalized_text
-from yargy.interpretation import (
-    InterpretationObject,
-    choice_best_span,
-    damerau_levenshtein_distance,
-)
+from yargy.interpretation import choice_best_span
+
+from natasha.distance import is_similar
+from natasha.grammars.interpretation import InterpretationObject, cached_property
 
 
 class PersonObject(InterpretationObject):
@@ -29,6 +28,14 @@ class PersonObject(InterpretationObject):
 
     MINIMUM_SIMILARITY_COEFFICIENT = 0
 
+    __slots__ = (
+        'firstname',
+        'middlename',
+        'lastname',
+        'descriptor',
+        'descriptor_destination',
+    )
+
     class Attributes(Enum):
 
         Firstname = 0  # владимир
@@ -37,13 +44,14 @@ class PersonObject(InterpretationObject):
         Descriptor = 3  # президент
         Descriptor_Destination = 4  # российской федерации
 
-    @property
+    @cached_property
     def gender(self):
         '''
         Very simple gender prediction algorithm
         '''
         counter = Counter()
-        for field, token in self.__dict__.items():
+        for field in self.get_fields():
+            token = getattr(self, field)
             if not isinstance(token, Token):
                 continue
             for form in token.forms:
@@ -57,7 +65,7 @@ class PersonObject(InterpretationObject):
                 counter.update(grammemes)
         return counter
 
-    @property
+    @cached_property
     def normalized_firstname(self):
         if self.firstname:
             return get_normalized_text(
@@ -66,7 +74,7 @@ class PersonObject(InterpretationObject):
         else:
             return None
 
-    @property
+    @cached_property
     def normalized_middlename(self):
         if self.middlename:
             return get_normalized_text(
@@ -75,7 +83,7 @@ class PersonObject(InterpretationObject):
         else:
             return None
 
-    @property
+    @cached_property
     def normalized_lastname(self):
         if self.lastname:
             return get_normalized_text(
@@ -84,7 +92,7 @@ class PersonObject(InterpretationObject):
         else:
             return None
 
-    @property
+    @cached_property
     def normalized_descriptor(self):
         if self.descriptor:
             return get_normalized_text(
@@ -113,9 +121,7 @@ class PersonObject(InterpretationObject):
         if a.startswith(b):
             return self.POSITIVE_COEF[index]
 
-        similarity = damerau_levenshtein_distance(a, b)
-
-        if similarity <= self.SIMILARITY_THRESHOLD:
+        if is_similar(a, b, self.SIMILARITY_THRESHOLD):
             return self.POSITIVE_COEF[index]
         else:
             return self.NEGATIVE_COEF[index]
@@ -129,34 +135,41 @@ class PersonObject(InterpretationObject):
 
     def similarity_middlename_coef(self, another):
         return self.similarity_check(
-            self.normalized_firstname,
-            another.normalized_firstname,
+            self.normalized_middlename,
+            another.normalized_middlename,
             1,
         )
 
     def similarity_lastname_coef(self, another):
         return self.similarity_check(
-            self.normalized_firstname,
-            another.normalized_firstname,
+            self.normalized_lastname,
+            another.normalized_lastname,
             2,
         )
 
+    @cached_property
+    def most_common_gender(self):
+        genders = self.gender.most_common(1)
+        if genders:
+            return genders[0][0]
+        return None
+
     def similarity_gender_coef(self, another):
-        if not self.gender.most_common(1) or not another.gender.most_common(1):
+        a, b = self.most_common_gender, another.most_common_gender
+        if not a or not b:
             return 0
         else:
-            return self.GENDER_COEF[
-                self.gender.most_common(1)[0] == another.gender.most_common(1)[0]
-            ]
+            return self.GENDER_COEF[a == b]
 
     def similarity_descriptor_coef(self, another):
         if not self.normalized_descriptor or not another.normalized_descriptor:
             return 0
-        similarity = damerau_levenshtein_distance(
+        similar = is_similar(
             self.normalized_descriptor,
             another.normalized_descriptor,
+            self.SIMILARITY_THRESHOLD,
         )
-        return self.DESCRIPTOR_COEF[similarity <= self.SIMILARITY_THRESHOLD]
+        return self.DESCRIPTOR_COEF[similar]
 
     def merge(self, another):
         return PersonObject(**{
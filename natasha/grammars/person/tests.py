@@ -4,8 +4,11 @@ from __future__ import unicode_literals
 
 import natasha
 
+from unittest import skipIf
+
 from natasha.tests import BaseTestCase
 from natasha.grammars.person import Person, ProbabilisticPerson, PersonObject
+from natasha.grammars.person.clustering import PersonClusterer, np
 
 from yargy.normalization import get_normalized_text
 from yargy.interpretation import InterpretationEngine
@@ -242,6 +245,20 @@ class PersonInterpretationTestCase(BaseTestCase):
             ('masc', 1),
         ])
 
+    def test_similarity_coefficients(self):
+        matches = self.combinator.resolve_matches(
+            self.combinator.extract('Иван Петрович Сидоров. Иван Сергеевич Козлов. Анна Сидорова. Иван Сидоров.')
+        )
+        first, second, third, fourth = self.engine.extract(matches)
+        # middlenames and lastnames are compared, not firstnames
+        self.assertEqual(first.similarity_middlename_coef(second), PersonObject.NEGATIVE_COEF[1])
+        self.assertEqual(first.similarity_lastname_coef(second), PersonObject.NEGATIVE_COEF[2])
+        self.assertEqual(first.similarity_lastname_coef(third), PersonObject.POSITIVE_COEF[2])
+        # genders are compared without counts of mentions
+        self.assertEqual(first.most_common_gender, 'masc')
+        self.assertEqual(first.similarity_gender_coef(fourth), PersonObject.GENDER_COEF[True])
+        self.assertEqual(first.similarity_gender_coef(third), PersonObject.GENDER_COEF[False])
+
     def test_coreference_solving(self):
         text = 'Н. Н. Вертинская - Надежда Николаевна'
         spans = list(
@@ -274,3 +291,120 @@ class PersonInterpretationTestCase(BaseTestCase):
 
         self.assertEqual(len(objects), 2)
         self.assertNotEqual(objects[0], objects[1])
+
+    def test_cached_attributes(self):
+        matches = self.combinator.resolve_matches(
+            self.combinator.extract('Н. Н. Вертинская - Надежда Николаевна')
+        )
+        objects = list(
+            self.engine.extract(matches)
+        )
+        first, second = objects
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertEqual(
+            [name for name, _ in first],
+            ['firstname', 'middlename', 'lastname', 'descriptor', 'descriptor_destination', 'spans'],
+        )
+        self.assertEqual(first.normalized_lastname, 'вертинская')
+        self.assertIs(first.gender, first.gender)
+
+        merged = first.merge(second)
+        self.assertEqual(merged.normalized_firstname, 'надежда')
+        self.assertEqual(merged.most_common_gender, 'femn')
+
+        first.lastname = second.firstname
+        self.assertEqual(first.normalized_lastname, 'надежда')
+        self.assertEqual(dict(first)['lastname'], second.firstname)
+
+
+@skipIf(np is None, 'numpy is not installed')
+class PersonClustererTestCase(BaseTestCase):
+
+    def setUp(self):
+        self.engine = InterpretationEngine(PersonObject)
+        self.clusterer = PersonClusterer()
+        super(PersonClustererTestCase, self).setUp()
+
+    def extract(self, text):
+        return list(
+            self.engine.extract(
+                self.combinator.resolve_matches(
+                    self.combinator.extract(text)
+                )
+            )
+        )
+
+    def get_reference_clusters(self, objects):
+        '''
+        Connected components of all pairs of similar objects
+        '''
+        parents = list(range(len(objects)))
+
+        def find(index):
+            while parents[index] != index:
+                index = parents[index]
+            return index
+
+        for a in range(len(objects)):
+            for b in range(a + 1, len(objects)):
+                if objects[a].similarity(objects[b]) >= PersonObject.MINIMUM_SIMILARITY_COEFFICIENT:
+                    parents[find(b)] = find(a)
+        clusters = {}
+        for index in range(len(objects)):
+            clusters.setdefault(find(index), []).append(index)
+        return sorted(clusters.values())
+
+    def test_clusters(self):
+        objects = self.extract(
+            'Н. Н. Вертинская пришла. Надежда Николаевна Вертинская сказала. '
+            'Иван Петров ответил, И. Петров ушёл. Анна Шерер. Надежда Николаевна ждала.'
+        )
+        clusters = self.clusterer.clusters(objects)
+        self.assertEqual(clusters, self.get_reference_clusters(objects))
+        self.assertEqual(len(clusters), 3)
+
+        pairs = list(self.clusterer.pairs(objects))
+        self.assertTrue(pairs)
+        for a, b, similarity in pairs:
+            self.assertEqual(similarity, objects[a].similarity(objects[b]))
+
+        lastnames = [
+            {objects[index].lastname.value for index in cluster if objects[index].lastname}
+            for cluster in clusters
+        ]
+        self.assertIn({'Вертинская'}, lastnames)
+        self.assertIn({'Петров'}, lastnames)
+
+    def test_clusters_approximation(self):
+        # different lastnames, but firstnames are similar (both are initials) and genders are same
+        objects = self.extract('И. Петров ушёл. В. Путин приехал.')
+        self.assertGreaterEqual(objects[0].similarity(objects[1]), 0)
+        self.assertEqual(self.get_reference_clusters(objects), [[0, 1]])
+        # pairs from different blocks aren't compared
+        self.assertEqual(list(self.clusterer.pairs(objects)), [])
+        self.assertEqual(self.clusterer.clusters(objects), [[0], [1]])
+
+    def test_initial_blocks(self):
+        # firstnames only: 'н', 'надежда', 'наталья', 'анна'
+        vocabularies = [['н', 'надежда', 'наталья', 'анна'], [], []]
+        features = np.full((4, 5), -1, dtype=np.int64)
+        features[:, 0] = [0, 1, 2, 3]
+        i, j = self.clusterer.get_candidate_pairs(features, vocabularies)
+        self.assertEqual(sorted(zip(i.tolist(), j.tolist())), [(0, 1), (0, 2)])
+
+    def test_merge(self):
+        objects = self.extract('Н. Н. Вертинская и Надежда Николаевна Вертинская')
+        merged = self.clusterer.merge(objects)
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0].firstname.value, 'Надежда')
+        self.assertEqual(merged[0].middlename.value, 'Николаевна')
+        self.assertEqual(merged[0].lastname.value, 'Вертинская')
+        self.assertEqual(self.clusterer.merge([]), [])
+
+
+@skipIf(np is not None, 'numpy is installed')
+class PersonClustererWithoutNumpyTestCase(BaseTestCase):
+
+    def test_import_error(self):
+        with self.assertRaises(ImportError):
+            PersonClusterer()
@@ -3,7 +3,20 @@ from __future__ import unicode_literals
 
 import os
 
-from yargy.pipeline import CustomGrammemesPipeline
+try:
+    # C-based DAWG
+    from dawg import CompletionDAWG
+    c_based_dawg = True
+except ImportError:
+    # Pure python DAWG version
+    from dawg_python import CompletionDAWG
+    c_based_dawg = False
+
+from yargy.tokenizer import Token
+from yargy.pipeline import (
+    DictionaryPipeline,
+    CustomGrammemesPipeline,
+)
 
 DICTIONARY_DIRECTORY = os.path.join(
     os.path.dirname(os.path.abspath(__file__)),
@@ -11,7 +24,110 @@ DICTIONARY_DIRECTORY = os.path.join(
 )
 
 
-class CommercialOrganisationPipeline(CustomGrammemesPipeline):
+class CompiledGrammemesPipeline(CustomGrammemesPipeline):
+
+    '''
+    CustomGrammemesPipeline that loads compiled dictionary from `Path` even when
+    C-based DAWG is available, so shipped dictionaries are used on all platforms,
+    `build` compiles `Dictionary` into `Path`
+    '''
+
+    def __init__(self, dictionary=None):
+        if dictionary is None and self.Path and os.path.exists(self.Path):
+            dictionary = CompletionDAWG().load(self.Path)
+        super(CompiledGrammemesPipeline, self).__init__(dictionary=dictionary)
+
+    def build(self):
+        if c_based_dawg:
+            CompletionDAWG(self.Dictionary).save(self.Path)
+        else:
+            raise NotImplementedError('You platform doesn\'t support building of dictionaries')
+
+
+class MergedGazetteerPipeline(DictionaryPipeline):
+
+    '''
+    Merges dictionaries of multiple CustomGrammemesPipeline instances into one automaton,
+    so all user-defined grammemes are assigned during single pass over token stream.
+    Entry that presents in multiple dictionaries (like 'центр' or 'музей')
+    gets forms with grammemes of each of them, and entry that is also a prefix
+    of longer entry (like 'группа' and 'группа_компания') is matched on its own
+    '''
+
+    def __init__(self, pipelines):
+        entries = {}
+        self.replace = set()
+        for pipeline in pipelines:
+            for key in pipeline.dictionary.keys():
+                entries.setdefault(key, []).append(pipeline.Grammemes)
+                if pipeline.Replace:
+                    self.replace.add(key)
+        separator = self.DICTIONARY_WORD_SEPARATOR
+        self.prefixes = set()
+        for key in entries:
+            words = key.split(separator)
+            for index in range(1, len(words)):
+                self.prefixes.add(separator.join(words[:index]) + separator)
+        super(MergedGazetteerPipeline, self).__init__(entries)
+
+    def __call__(self, stream):
+        self.stream = stream
+        self.tokens = self.get_next_token()
+        return self
+
+    def __iter__(self):
+        return self.tokens
+
+    def __next__(self):
+        return next(self.tokens)
+
+    def matches_prefix(self, stack):
+        separator = self.DICTIONARY_WORD_SEPARATOR
+        for form in self.merge_stack(stack):
+            if separator.join(form) + separator in self.prefixes:
+                return True
+        return False
+
+    def get_next_token(self):
+        '''
+        Longest-match scan: tokens are collected while they form prefix of some entry,
+        then the longest complete entry from the head of collected tokens is merged
+        into one token, and the rest of tokens are scanned again
+        '''
+        pending = []
+        for token in self.stream:
+            pending.append(token)
+            while pending and not self.matches_prefix(pending):
+                yield self.pop_longest_match(pending)
+        while pending:
+            yield self.pop_longest_match(pending)
+
+    def pop_longest_match(self, pending):
+        for size in range(len(pending), 0, -1):
+            match, key = self.matches_complete_word(pending[:size])
+            if match:
+                token = self.create_new_token(pending[:size], key)
+                del pending[:size]
+                return token
+        return pending.pop(0)
+
+    def create_new_token(self, stack, match):
+        forms = [
+            {
+                'grammemes': grammemes,
+                'normal_form': match,
+            } for grammemes in self.dictionary[match]
+        ]
+        if len(stack) == 1 and match not in self.replace:
+            forms = stack[0].forms + forms
+        return Token(
+            self.get_original_form(stack),
+            self.get_position(stack),
+            forms,
+        )
+
+
+class CommercialOrganisationPipeline(CompiledGrammemesPipeline):
 
     Grammemes = {
         'Orgn/Commercial',
@@ -63,7 +179,7 @@ class CommercialOrganisationPipeline(CustomGrammemesPipeline):
     Path = os.path.join(DICTIONARY_DIRECTORY, 'orgn_commercial.dawg')
 
 
-class SocialOrganisationPipeline(CustomGrammemesPipeline):
+class SocialOrganisationPipeline(CompiledGrammemesPipeline):
 
     Grammemes = {
         'Orgn/Social',
@@ -131,7 +247,7 @@ class SocialOrganisationPipeline(CustomGrammemesPipeline):
     Path = os.path.join(DICTIONARY_DIRECTORY, 'orgn_social.dawg')
 
 
-class EducationalOrganisationPipeline(CustomGrammemesPipeline):
+class EducationalOrganisationPipeline(CompiledGrammemesPipeline):
 
     Grammemes = {
         'Orgn/Educational',
@@ -154,7 +270,7 @@ class EducationalOrganisationPipeline(CustomGrammemesPipeline):
     Path = os.path.join(DICTIONARY_DIRECTORY, 'orgn_educational.dawg')
 
 
-class AbbreviationalOrganisationPipeline(CustomGrammemesPipeline):
+class AbbreviationalOrganisationPipeline(CompiledGrammemesPipeline):
 
     Grammemes = {
         'Orgn/Abbr',
@@ -178,7 +294,7 @@ class AbbreviationalOrganisationPipeline(CustomGrammemesPipeline):
     }
     Path = os.path.join(DICTIONARY_DIRECTORY, 'orgn_abbr.dawg')
 
-class PersonPositionPipeline(CustomGrammemesPipeline):
+class PersonPositionPipeline(CompiledGrammemesPipeline):
 
     Grammemes = {
         'Person/Position',
@@ -0,0 +1,226 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from natasha.utils import split_sentences
+from natasha.automaton import copy_token
+from natasha.prefilter import get_tokens_features
+
+
+def shift_tokens(tokens, delta):
+    shifted = []
+    for token in tokens:
+        token = copy_token(token)
+        start, end = token.position
+        token.position = (start + delta, end + delta)
+        shifted.append(token)
+    return shifted
+
+
+def get_common_affixes_lengths(a, b):
+    '''
+    Returns lengths of common prefix and common suffix of strings, which don't overlap
+    '''
+    limit = min(len(a), len(b))
+    prefix = 0
+    while prefix < limit and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and a[-suffix - 1] == b[-suffix - 1]:
+        suffix += 1
+    return prefix, suffix
+
+
+class Sentence(object):
+
+    '''
+    Tokens of sentence (after pipelines), their features for prefilter, matches,
+    which were found while tokens of sentence were fed to grammars, and flag,
+    whether all grammars were in initial state before first token of sentence
+    '''
+
+    __slots__ = (
+        'start',
+        'end',
+        'tokens',
+        'features',
+        'initial',
+        'matches',
+    )
+
+    def __init__(self, start, end, tokens):
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+        self.features = get_tokens_features(tokens)
+        self.initial = False
+        self.matches = []
+
+    def shift(self, delta):
+        self.start += delta
+        self.end += delta
+        for token in self.tokens:
+            start, end = token.position
+            token.position = (start + delta, end + delta)
+        self.matches = [
+            (grammar, shift_tokens(tokens, delta)) for grammar, tokens in self.matches
+        ]
+
+
+class IncrementalExtractor(object):
+
+    '''
+    Extracts matches from edited versions of the same document, keeping tokens
+    (with morphological analysis) and matches of previous version:
+        extractor = IncrementalExtractor(combinator)
+        matches = extractor.update(text)
+        matches = extractor.edit(start, end, replacement)
+    Text is split into sentences and only changed sentences are tokenized again.
+    Grammars are run from the last sentence before edit, where all of them were
+    in initial state, until the first unchanged sentence after edit, where they are
+    in initial state again both in previous and current version, so following matches
+    of previous version are reused. Results are the same as list(combinator.extract(text))
+    '''
+
+    def __init__(self, combinator, text=''):
+        self.combinator = combinator
+        self.text = ''
+        self.sentences = [Sentence(0, 0, [])]
+        self.sentences[0].initial = True
+        self.grammars = None
+        # matches, found at end of stream
+        self.final = []
+        # number of sentences, tokenized and fed to grammars by last update
+        self.tokenized = 0
+        self.parsed = 0
+        self.current = None
+        self.stopped = False
+        self.edit(0, 0, text)
+
+    @property
+    def matches(self):
+        '''
+        Returns list of (grammar, tokens) matches of current text
+        '''
+        matches = []
+        for sentence in self.sentences:
+            matches.extend(sentence.matches)
+        matches.extend(self.final)
+        return matches
+
+    def update(self, text):
+        '''
+        Replaces text by its new version, changed part is found by comparison
+        of common prefix and suffix, returns matches of new text
+        '''
+        prefix, suffix = get_common_affixes_lengths(self.text, text)
+        return self.edit(prefix, len(self.text) - suffix, text[prefix:len(text) - suffix])
+
+    def edit(self, start, end, replacement):
+        '''
+        Replaces self.text[start:end] by replacement, returns matches of new text
+        '''
+        text = self.text[:start] + replacement + self.text[end:]
+        delta = len(replacement) - (end - start)
+        spans = split_sentences(text)
+        previous = self.sentences
+
+        # sentences before and after edit, which have the same text, are reused
+        head = 0
+        while head < len(previous) and head < len(spans):
+            sentence = previous[head]
+            if sentence.end > start or spans[head] != (sentence.start, sentence.end):
+                break
+            head += 1
+        tail = 0
+        while tail < len(previous) - head and tail < len(spans) - head:
+            sentence = previous[-tail - 1]
+            if sentence.start < end or spans[-tail - 1] != (sentence.start + delta, sentence.end + delta):
+                break
+            tail += 1
+
+        changed = [
+            Sentence(sentence_start, sentence_end, self.tokenize(text, sentence_start, sentence_end))
+            for sentence_start, sentence_end in spans[head:len(spans) - tail]
+        ]
+        reused = previous[len(previous) - tail:]
+        if delta:
+            for sentence in reused:
+                sentence.shift(delta)
+            self.final = [
+                (grammar, shift_tokens(tokens, delta)) for grammar, tokens in self.final
+            ]
+        self.sentences = previous[:head] + changed + reused
+        self.text = text
+        self.tokenized = len(changed)
+
+        grammars = self.select_grammars()
+        if self.grammars is None or not set(grammars) <= set(self.grammars):
+            # states of new grammars in previous version are unknown. Grammars,
+            # which aren't selected by prefilter anymore, can't match, so they are kept
+            # and set of grammars only grows, as anchors of edited text are found
+            if self.grammars is not None:
+                grammars = [
+                    grammar for grammar in self.combinator.grammars
+                    if grammar in grammars or grammar in self.grammars
+                ]
+            self.grammars = grammars
+            restart = 0
+            stop = len(self.sentences)
+        else:
+            restart = min(head, len(previous) - 1)
+            # state before first changed sentence is the same as in previous version
+            while not previous[restart].initial:
+                restart -= 1
+            stop = len(self.sentences) - tail
+        self.parse(restart, stop)
+        return self.matches
+
+    def tokenize(self, text, start, end):
+        combinator = self.combinator
+        stream = combinator.tokenize_segments([(start, text[start:end])])
+        return list(combinator.apply_pipelines(stream))
+
+    def select_grammars(self):
+        prefilter = self.combinator.prefilter
+        if not prefilter:
+            return self.combinator.grammars
+        grammemes = set()
+        normal_forms = set()
+        for sentence in self.sentences:
+            grammemes.update(sentence.features[0])
+            normal_forms.update(sentence.features[1])
+        return prefilter.select_by_features(grammemes, normal_forms)
+
+    def parse(self, restart, stop):
+        '''
+        Feeds sentences from `restart` to grammars, until sentence, which isn't before
+        `stop` and was in initial state in previous version, is reached in initial state
+        '''
+        combinator = self.combinator
+        self.stopped = False
+        self.parsed = 0
+        final = []
+        stream = self.iterate_tokens(restart, stop)
+        for grammar, tokens in combinator.parse(stream, self.grammars):
+            match = (combinator.classes[grammar.name], tokens)
+            if self.current is None:
+                final.append(match)
+            else:
+                self.current.matches.append(match)
+        if not self.stopped:
+            self.final = final
+
+    def iterate_tokens(self, restart, stop):
+        for index in range(restart, len(self.sentences)):
+            sentence = self.sentences[index]
+            initial = self.combinator.is_initial(self.grammars)
+            if index >= stop and initial and sentence.initial:
+                self.stopped = True
+                break
+            sentence.initial = initial
+            sentence.matches = []
+            self.current = sentence
+            self.parsed += 1
+            for token in sentence.tokens:
+                yield token
+        self.current = None
@@ -0,0 +1,65 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+
+class Match(object):
+
+    '''
+    Compact result of extraction: grammar member, (start, end) offsets of characters
+    in source text and normalized text of match. Tokens with morphological forms
+    aren't kept, they are rebuilt on first access to `tokens` by parsing span
+    of source text again by the same grammar
+    '''
+
+    __slots__ = (
+        'grammar',
+        'start',
+        'end',
+        'normalized',
+        'source',
+        'combinator',
+        '_tokens',
+    )
+
+    def __init__(self, grammar, start, end, normalized, source=None, combinator=None):
+        self.grammar = grammar
+        self.start = start
+        self.end = end
+        self.normalized = normalized
+        self.source = source
+        self.combinator = combinator
+        self._tokens = None
+
+    @property
+    def span(self):
+        return self.start, self.end
+
+    @property
+    def text(self):
+        return self.source[self.start:self.end]
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            if self.combinator is None:
+                raise ValueError('Tokens of match can\'t be rebuilt without combinator')
+            self._tokens = self.combinator.find_tokens(self.grammar, self.source, self.start, self.end)
+        return self._tokens
+
+    def drop_tokens(self):
+        self._tokens = None
+
+    def as_tuple(self):
+        return self.grammar, self.start, self.end, self.normalized
+
+    def __eq__(self, other):
+        return isinstance(other, Match) and self.as_tuple() == other.as_tuple()
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return 'Match({0}, {1}, {2}, {3!r})'.format(*self.as_tuple())
@@ -0,0 +1,113 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+import io
+
+from threading import Lock
+from collections import OrderedDict, namedtuple
+
+from yargy.morph import Analyzer
+from yargy.tokenizer import Tokenizer
+
+
+# analysis of word takes ~4kb of memory, so default cache takes ~40mb
+DEFAULT_MORPH_CACHE_SIZE = 10000
+
+MorphCacheInfo = namedtuple('MorphCacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def read_frequency_list(path, encoding='utf-8'):
+    '''
+    Reads words from frequency list file, where each line starts with word,
+    optionally followed by its frequency or other columns ('рубль 1234')
+    '''
+    with io.open(path, encoding=encoding) as file:
+        for line in file:
+            parts = line.split()
+            if parts:
+                yield parts[0]
+
+
+class MorphCache(object):
+
+    '''
+    Size-bounded LRU cache of word -> forms (results of morphological analysis
+    in format of yargy.Tokenizer), which can be shared by tokenizers of multiple
+    combinators. Forms are shared between tokens, so they must not be modified.
+    Cache is thread-safe, `cache_info` returns statistics like functools.lru_cache
+    '''
+
+    def __init__(self, maxsize=DEFAULT_MORPH_CACHE_SIZE, analyzer=Analyzer):
+        self.maxsize = maxsize
+        self.analyzer = analyzer
+        self.analyze = Tokenizer(morph_analyzer=analyzer).get_word_forms
+        self.forms = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, word):
+        with self.lock:
+            forms = self.forms.pop(word, None)
+            if forms is not None:
+                # move word to the end of queue
+                self.forms[word] = forms
+                self.hits += 1
+                return forms
+            self.misses += 1
+        # analysis is done outside of lock, concurrent misses of same word are harmless
+        forms = self.analyze(word)
+        self.add(word, forms)
+        return forms
+
+    def __len__(self):
+        return len(self.forms)
+
+    def __contains__(self, word):
+        return word in self.forms
+
+    def add(self, word, forms):
+        with self.lock:
+            self.forms.pop(word, None)
+            self.forms[word] = forms
+            while len(self.forms) > self.maxsize:
+                self.forms.popitem(last=False)
+
+    def warm(self, words, limit=None):
+        '''
+        Analyzes words of frequency list (most frequent first) in advance, without
+        affecting statistics. At most `maxsize` words are taken, and they are added in reverse
+        order, so the most frequent words are the last to be evicted
+        '''
+        if limit is None or limit > self.maxsize:
+            limit = self.maxsize
+        selected = []
+        seen = set()
+        for word in words:
+            if len(selected) >= limit:
+                break
+            if word not in seen:
+                seen.add(word)
+                selected.append(word)
+        for word in reversed(selected):
+            if word not in self.forms:
+                self.add(word, self.analyze(word))
+        return len(selected)
+
+    def cache_info(self):
+        return MorphCacheInfo(self.hits, self.misses, self.maxsize, len(self.forms))
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def clear(self):
+        with self.lock:
+            self.forms.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# shared by all combinators in process, see Combinator `morph_cache` argument
+DEFAULT_MORPH_CACHE = MorphCache()
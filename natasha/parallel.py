@@ -0,0 +1,152 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+try:
+    import copyreg
+except ImportError:
+    # python 2
+    import copy_reg as copyreg
+
+from multiprocessing import Pool
+
+from yargy.tokenizer import Token
+
+from natasha import Combinator
+from natasha.utils import split_shards, DEFAULT_SHARD_SIZE
+
+
+def reduce_grammar(grammar):
+    return getattr, (grammar.__class__, grammar.name)
+
+
+def register_grammars(grammars):
+    '''
+    Makes members of grammar enums picklable by name, by default enum members are
+    pickled with their values, which contain labels that can't be pickled
+    '''
+    for grammar in grammars:
+        copyreg.pickle(grammar, reduce_grammar)
+
+
+def strip_token(token):
+    '''
+    Returns copy of token without pymorphy2 analyzer units in `methods_stack`,
+    because they hold references to morphology dictionaries and can't be sent
+    between processes
+    '''
+    forms = [
+        {key: value for key, value in form.items() if key != 'methods_stack'}
+        for form in token.forms
+    ]
+    return Token(
+        token.value,
+        token.position,
+        forms,
+        token.normalization_type,
+        token.interpretation,
+    )
+
+
+def strip_match(grammar, tokens):
+    return grammar, [strip_token(token) for token in tokens]
+
+
+# combinator instance of current worker process and function
+# applied to each match, both are set once by pool initializer
+combinator = None
+transform_match = strip_match
+
+
+def initialize_worker(grammars, pipelines, transform):
+    global combinator, transform_match
+    register_grammars(grammars)
+    combinator = Combinator(grammars, pipelines=pipelines)
+    transform_match = transform
+
+
+def extract(text, offset=0):
+    matches = []
+    for grammar, tokens in combinator.extract(text):
+        if offset:
+            for token in tokens:
+                start, end = token.position
+                token.position = (start + offset, end + offset)
+        matches.append(transform_match(grammar, tokens))
+    return matches
+
+
+def extract_shard(item):
+    offset, text = item
+    return extract(text, offset=offset)
+
+
+def extract_with_index(item):
+    index, text = item
+    return index, extract(text)
+
+
+class ExtractionPool(object):
+
+    '''
+    Pool of processes, each of them builds its own Combinator once and reuses it for all texts.
+    Matches are passed to `transform` function inside of worker process, by default
+    tokens are copied without pymorphy2 internals, so results can be pickled
+    '''
+
+    def __init__(self, grammars, processes=None, pipelines=None, transform=strip_match):
+        self.pool = Pool(
+            processes=processes,
+            initializer=initialize_worker,
+            initargs=(grammars, pipelines, transform),
+        )
+
+    def imap(self, texts, chunksize=1):
+        '''
+        Yields list of matches for each text in same order as texts were given
+        '''
+        return self.pool.imap(extract, texts, chunksize)
+
+    def imap_with_keys(self, items, chunksize=1):
+        '''
+        Yields (key, matches) tuples for (key, text) items in same order as items were given,
+        keys are passed to worker processes, so they must be picklable
+        '''
+        return self.pool.imap(extract_with_index, items, chunksize)
+
+    def imap_unordered(self, texts, chunksize=1):
+        '''
+        Yields (index, matches) tuples in order of completion,
+        index is position of text in `texts` iterable
+        '''
+        return self.pool.imap_unordered(extract_with_index, enumerate(texts), chunksize)
+
+    def extract_document(self, text, shard_size=DEFAULT_SHARD_SIZE, chunksize=1):
+        '''
+        Returns matches of single large document: text is split into shards of whole
+        sentences (see natasha.utils.split_shards), which are extracted by worker processes
+        concurrently. Matches are merged in order of shards, positions of tokens are
+        relative to whole text (they are shifted before `transform` is applied).
+        Grammars don't cross sentence boundaries, except quoted names of organisations,
+        so shards aren't cut inside of quotes
+        '''
+        matches = []
+        for shard in self.pool.imap(extract_shard, split_shards(text, size=shard_size), chunksize):
+            matches.extend(shard)
+        return matches
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def terminate(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
@@ -0,0 +1,93 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from functools import partial
+
+from yargy.compat import string_type
+
+
+def get_label_anchors(label):
+    '''
+    Yields anchors, which must present in token matched by label:
+    ('gram', grammeme) or ('dictionary', frozenset of normal forms)
+    '''
+    if not isinstance(label, partial):
+        return
+    name = getattr(label.func, '__name__', None)
+    if name == 'gram':
+        yield ('gram', label.args[0])
+    elif name == 'gram_in':
+        for value in label.args[0]:
+            yield ('gram', value)
+    elif name == 'dictionary':
+        yield ('dictionary', frozenset(label.args[0]))
+    elif name == 'and_':
+        for nested in label.args[0]:
+            for anchor in get_label_anchors(nested):
+                yield anchor
+
+
+def get_rules_anchors(rules):
+    '''
+    Returns set of anchors required by non-optional rules of grammar,
+    rules that aren't plain dicts (like OR) are skipped
+    '''
+    anchors = set()
+    for rule in rules:
+        if not isinstance(rule, dict) or rule.get('optional') or rule.get('terminal'):
+            continue
+        for label in rule.get('labels', []):
+            anchors.update(get_label_anchors(label))
+    return frozenset(anchors)
+
+
+def get_tokens_features(tokens):
+    '''
+    Returns sets of grammemes and normal forms of all tokens
+    '''
+    grammemes = set()
+    normal_forms = set()
+    for token in tokens:
+        is_string = isinstance(token.value, string_type)
+        for form in token.forms:
+            grammemes.update(form['grammemes'])
+            if is_string:
+                normal_forms.add(form['normal_form'])
+    return grammemes, normal_forms
+
+
+class Prefilter(object):
+
+    '''
+    Precomputed index of anchors (grammemes and dictionary lemmas), required by each grammar.
+    Grammar can't match text, where at least one of its anchors is absent,
+    so such grammars are skipped by combinator
+    '''
+
+    def __init__(self, grammars):
+        self.grammars = grammars
+        self.anchors = [
+            get_rules_anchors(grammar.rules) for grammar in grammars
+        ]
+
+    def select(self, tokens):
+        '''
+        Returns grammars, which anchors present in given tokens, in original order
+        '''
+        return self.select_by_features(*get_tokens_features(tokens))
+
+    def select_by_features(self, grammemes, normal_forms):
+        '''
+        Same as select, but takes precomputed features of tokens (see get_tokens_features)
+        '''
+        selected = []
+        for grammar, anchors in zip(self.grammars, self.anchors):
+            for kind, value in anchors:
+                if kind == 'gram':
+                    if value not in grammemes:
+                        break
+                elif normal_forms.isdisjoint(value):
+                    break
+            else:
+                selected.append(grammar)
+        return selected
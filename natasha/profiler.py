@@ -0,0 +1,118 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+import json
+
+from timeit import default_timer as timer
+
+
+class GrammarStats(object):
+
+    '''
+    Counters of single grammar:
+        calls - number of tokens shifted into grammar
+        partial_matches - number of partial matches started (stack became non-empty)
+        matches - number of complete matches
+        matched_tokens - number of tokens in complete matches
+        time - cumulative time of shift & reduce calls in seconds
+    '''
+
+    __slots__ = (
+        'calls',
+        'partial_matches',
+        'matches',
+        'matched_tokens',
+        'time',
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.partial_matches = 0
+        self.matches = 0
+        self.matched_tokens = 0
+        self.time = 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Profiler(object):
+
+    '''
+    Collects statistics of each grammar in combinator, enabled by `Combinator(..., profile=True)`
+    '''
+
+    def __init__(self, grammars):
+        self.names = [grammar.name for grammar in grammars]
+        self.reset()
+
+    def reset(self):
+        self.stats = {name: GrammarStats() for name in self.names}
+
+    def step(self, grammar, token):
+        '''
+        Shifts token into grammar and reduces it, same as combinator does,
+        but measures time of both calls
+        '''
+        stats = self.stats[grammar.name]
+        started = not grammar.stack
+        start = timer()
+        grammar.shift(token)
+        match = grammar.reduce()
+        stats.time += timer() - start
+        stats.calls += 1
+        if started and (match or grammar.stack):
+            stats.partial_matches += 1
+        if match:
+            stats.matches += 1
+            stats.matched_tokens += len(match)
+        return match
+
+    def finish(self, grammar):
+        '''
+        Reduces grammar at the end of stream
+        '''
+        stats = self.stats[grammar.name]
+        start = timer()
+        match = grammar.reduce(end_of_stream=True)
+        stats.time += timer() - start
+        if match:
+            stats.matches += 1
+            stats.matched_tokens += len(match)
+        return match
+
+    def as_dict(self):
+        return {
+            name: stats.as_dict() for name, stats in self.stats.items()
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), sort_keys=True, **kwargs)
+
+    def report(self, limit=None, sort='time'):
+        '''
+        Returns text table of grammars statistics, sorted by `sort` counter in descending order
+        '''
+        total = sum(stats.time for stats in self.stats.values()) or 1.0
+        items = sorted(
+            self.stats.items(),
+            key=lambda item: getattr(item[1], sort),
+            reverse=True,
+        )[:limit]
+        width = max([len('grammar')] + [len(name) for name, _ in items])
+        template = '{0:<{width}} {1:>10} {2:>10} {3:>10} {4:>10} {5:>10} {6:>7}'
+        lines = [
+            template.format('grammar', 'calls', 'partial', 'matches', 'tokens', 'time, ms', '%', width=width),
+        ]
+        for name, stats in items:
+            lines.append(template.format(
+                name,
+                stats.calls,
+                stats.partial_matches,
+                stats.matches,
+                stats.matched_tokens,
+                '{0:.2f}'.format(stats.time * 1000),
+                '{0:.1f}'.format(stats.time / total * 100),
+                width=width,
+            ))
+        return '\n'.join(lines)
@@ -0,0 +1,80 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+from yargy.compat import str
+from yargy.tokenizer import Token
+from yargy.normalization import get_normalized_text
+from yargy.interpretation import InterpretationEngine
+
+from natasha.grammars.person import Person, ProbabilisticPerson, PersonObject
+from natasha.grammars.location import Location, Address, LocationObject, AddressObject
+from natasha.grammars.organisation import Organisation, ProbabilisticOrganisation, OrganisationObject
+
+
+INTERPRETATION_OBJECTS = {
+    Person: PersonObject,
+    ProbabilisticPerson: PersonObject,
+    Location: LocationObject,
+    Address: AddressObject,
+    Organisation: OrganisationObject,
+    ProbabilisticOrganisation: OrganisationObject,
+}
+
+INTERPRETATION_ENGINES = {
+    grammar: InterpretationEngine(object_class)
+    for grammar, object_class in INTERPRETATION_OBJECTS.items()
+}
+
+
+def normalize_tokens(tokens):
+    '''
+    Returns normalized text of tokens, or their original values, when
+    pymorphy2 can't inflect some of them
+    '''
+    try:
+        return get_normalized_text(tokens)
+    except ValueError:
+        if isinstance(tokens, Token):
+            tokens = [tokens]
+        return ' '.join(str(token.value) for token in tokens)
+
+
+def get_span(tokens):
+    if isinstance(tokens, Token):
+        tokens = [tokens]
+    return [tokens[0].position[0], tokens[-1].position[1]]
+
+
+def serialize_attributes(grammar, tokens):
+    '''
+    Returns interpretation attributes of match (normalized text and span of each attribute),
+    grammars without interpretation objects have no attributes
+    '''
+    engine = INTERPRETATION_ENGINES.get(grammar.__class__)
+    if engine is None:
+        return {}
+    for obj in engine.extract([(grammar, tokens)]):
+        return {
+            name: {
+                'normalized': normalize_tokens(value),
+                'span': get_span(value),
+            }
+            for name, value in obj if value and name != 'spans'
+        }
+    return {}
+
+
+def serialize_match(grammar, tokens):
+    '''
+    Returns JSON-serializable dict with grammar name, span of text (offsets of characters),
+    normalized text and interpretation attributes of match.
+    Can be used as `transform` of ExtractionPool, because normalization requires
+    pymorphy2 internals of tokens, which are stripped before sending between processes
+    '''
+    return {
+        'grammar': grammar.__class__.__name__,
+        'rule': grammar.name,
+        'span': get_span(tokens),
+        'normalized': normalize_tokens(tokens),
+        'attributes': serialize_attributes(grammar, tokens),
+    }
@@ -0,0 +1,282 @@
+# coding: utf-8
+'''
+Long-running extraction server, keeps warm combinator (or pool of worker processes)
+and answers JSON requests over local HTTP or Unix socket:
+
+    python -m natasha.server --port 8080 --workers 4
+    python -m natasha.server --socket /tmp/natasha.sock
+
+    POST /extract {"texts": ["...", ...]} -> {"results": [[match, ...], ...]}
+    GET /health -> {"status": "ok", ...}
+    GET /metrics -> {"requests": ..., "texts": ..., ...}
+
+Matches are serialized by natasha.serialization.serialize_match
+'''
+from __future__ import unicode_literals
+
+import os
+import sys
+import json
+import stat
+import argparse
+import traceback
+
+from threading import Lock
+from timeit import default_timer as timer
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn, UnixStreamServer
+except ImportError:
+    # python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn, UnixStreamServer
+
+from natasha import Combinator, DEFAULT_GRAMMARS, __version__
+from natasha.parallel import ExtractionPool
+from natasha.serialization import serialize_match
+
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+DEFAULT_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+
+class Extractor(object):
+
+    '''
+    Extracts serialized matches of texts by single combinator (requests are processed
+    one by one) or, when `workers` is given, by ExtractionPool of worker processes
+    '''
+
+    def __init__(self, grammars=DEFAULT_GRAMMARS, workers=0):
+        self.workers = workers
+        if workers:
+            self.combinator = None
+            self.pool = ExtractionPool(grammars, processes=workers, transform=serialize_match)
+        else:
+            self.combinator = Combinator(grammars)
+            self.pool = None
+            self.lock = Lock()
+
+    def extract(self, texts):
+        '''
+        Returns list of serialized matches for each text
+        '''
+        if self.pool:
+            return list(self.pool.imap(texts))
+        with self.lock:
+            return [
+                [serialize_match(grammar, tokens) for grammar, tokens in self.combinator.extract(text)]
+                for text in texts
+            ]
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+
+
+class Metrics(object):
+
+    def __init__(self):
+        self.lock = Lock()
+        self.started = timer()
+        self.requests = 0
+        self.errors = 0
+        self.texts = 0
+        self.characters = 0
+        self.matches = 0
+        self.extraction_time = 0.0
+
+    def record(self, texts, results, time):
+        with self.lock:
+            self.requests += 1
+            self.texts += len(texts)
+            self.characters += sum(len(text) for text in texts)
+            self.matches += sum(len(matches) for matches in results)
+            self.extraction_time += time
+
+    def record_error(self):
+        with self.lock:
+            self.requests += 1
+            self.errors += 1
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                'uptime': timer() - self.started,
+                'requests': self.requests,
+                'errors': self.errors,
+                'texts': self.texts,
+                'characters': self.characters,
+                'matches': self.matches,
+                'extraction_time': self.extraction_time,
+            }
+
+
+class RequestError(Exception):
+
+    def __init__(self, status, message):
+        super(RequestError, self).__init__(message)
+        self.status = status
+
+
+def parse_texts(body):
+    '''
+    Returns list of texts from request body: {"texts": [...]} or {"text": "..."}
+    '''
+    try:
+        data = json.loads(body.decode('utf-8'))
+    except ValueError as error:
+        raise RequestError(400, 'Invalid JSON: {0}'.format(error))
+    if not isinstance(data, dict):
+        raise RequestError(400, 'Request must be JSON object')
+    if 'texts' in data:
+        texts = data['texts']
+    elif 'text' in data:
+        texts = [data['text']]
+    else:
+        raise RequestError(400, 'Request must contain "texts" or "text"')
+    if not isinstance(texts, list) or not all(isinstance(text, type('')) for text in texts):
+        raise RequestError(400, '"texts" must be list of strings')
+    return texts
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+
+    server_version = 'natasha/' + __version__
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, {
+                'status': 'ok',
+                'version': __version__,
+                'workers': self.server.extractor.workers,
+            })
+        elif self.path == '/metrics':
+            self.send_json(200, self.server.metrics.as_dict())
+        else:
+            self.send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if self.path != '/extract':
+            self.send_json(404, {'error': 'Not found'})
+            return
+        try:
+            try:
+                size = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                raise RequestError(400, 'Invalid Content-Length')
+            if size < 0:
+                raise RequestError(400, 'Invalid Content-Length')
+            if size > self.server.max_request_size:
+                raise RequestError(413, 'Request is too large')
+            texts = parse_texts(self.rfile.read(size))
+            start = timer()
+            results = self.server.extractor.extract(texts)
+        except RequestError as error:
+            self.server.metrics.record_error()
+            self.send_json(error.status, {'error': str(error)})
+            return
+        except Exception:
+            self.server.metrics.record_error()
+            # details of error may expose internals, so they are only logged
+            self.log_error('Extraction failed\n%s', traceback.format_exc())
+            self.send_json(500, {'error': 'Internal server error'})
+            return
+        self.server.metrics.record(texts, results, timer() - start)
+        self.send_json(200, {'results': results})
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def log_error(self, format, *args):
+        # errors are logged in quiet mode too
+        BaseHTTPRequestHandler.log_message(self, format, *args)
+
+
+class ExtractionServerMixin(ThreadingMixIn):
+
+    daemon_threads = True
+    quiet = False
+    max_request_size = DEFAULT_MAX_REQUEST_SIZE
+
+    def setup_extraction(self, extractor, quiet=False):
+        self.extractor = extractor
+        self.metrics = Metrics()
+        self.quiet = quiet
+
+
+class ExtractionHTTPServer(ExtractionServerMixin, HTTPServer):
+    pass
+
+
+class ExtractionUnixServer(ExtractionServerMixin, UnixStreamServer):
+
+    def get_request(self):
+        request, _ = UnixStreamServer.get_request(self)
+        # BaseHTTPRequestHandler expects (host, port) address
+        return request, ('', 0)
+
+
+def remove_socket(path):
+    '''
+    Removes unix socket left by previous server, raises ValueError when path
+    is a file of other type, so it isn't removed by mistake
+    '''
+    try:
+        mode = os.stat(path).st_mode
+    except OSError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError('{0} exists and is not a socket'.format(path))
+    os.unlink(path)
+
+
+def create_server(extractor, host=DEFAULT_HOST, port=DEFAULT_PORT, socket=None, quiet=False):
+    '''
+    Returns server bound to unix `socket` path or to (`host`, `port`)
+    '''
+    if socket:
+        remove_socket(socket)
+        server = ExtractionUnixServer(socket, RequestHandler)
+    else:
+        server = ExtractionHTTPServer((host, port), RequestHandler)
+    server.setup_extraction(extractor, quiet=quiet)
+    return server
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Natasha extraction server')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help='path of unix socket, replaces --host and --port')
+    parser.add_argument('--workers', type=int, default=0, help='number of worker processes, 0 - extract in server process')
+    parser.add_argument('--quiet', action='store_true', help='don\'t log requests')
+    args = parser.parse_args(args)
+
+    extractor = Extractor(workers=args.workers)
+    server = create_server(extractor, host=args.host, port=args.port, socket=args.socket, quiet=args.quiet)
+    sys.stderr.write('Serving on {0}\n'.format(args.socket or '{0}:{1}'.format(*server.server_address)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        extractor.close()
+        if args.socket:
+            remove_socket(args.socket)
+
+
+if __name__ == '__main__':
+    main()
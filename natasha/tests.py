@@ -6,12 +6,65 @@ try:
 except NameError:
     range = range
 
+import io
+import os
 import sys
+import json
+import socket
+import types
+import shutil
 import platform
+import tempfile
 import unittest
+import threading
+import subprocess
 import natasha
 
+from decimal import Decimal
+from datetime import date
+
+try:
+    from http.client import HTTPConnection
+except ImportError:
+    # python 2
+    from httplib import HTTPConnection
+
+from natasha.bench import (
+    build_corpus,
+    build_address_corpus,
+    benchmark_extraction,
+    benchmark_gazetteer_memory,
+    get_dictionary_size,
+    read_memory,
+    compare,
+    merge_runs,
+)
+from natasha.parallel import ExtractionPool
+from natasha.incremental import IncrementalExtractor
+from natasha.combinator import collect_labels
+from natasha.morph import MorphCache, DEFAULT_MORPH_CACHE, read_frequency_list
+from natasha.utils import split_sentences, split_shards, read_segments, lazy_module
+from natasha.server import Extractor, create_server
+from natasha.serialization import serialize_match
+from natasha.__main__ import main as run_command
+if sys.version_info >= (3, 5, 3):
+    import asyncio
+    from natasha.aio import AsyncCombinator
+else:
+    AsyncCombinator = None
+from natasha.grammars.date import DateResolver, DateInterval, MONTH_DICTIONARY, DAY_OF_WEEK_DICTIONARY
+from natasha.grammars.date.resolver import MONTHS, DAYS_OF_WEEK
+from natasha.grammars.money import MoneyInterpretation, PREFIX_DICTIONARY
+from natasha.grammars.money.interpretation import PREFIX_MULTIPLIERS
+from natasha.distance import bounded_damerau_levenshtein_distance, is_similar
+from natasha.grammars.pipelines import (
+    CompletionDAWG,
+    MergedGazetteerPipeline,
+)
+from dawg_python import CompletionDAWG as PythonCompletionDAWG
+from yargy.tokenizer import Tokenizer
 from yargy.normalization import get_normalized_text
+from yargy.interpretation import damerau_levenshtein_distance
 
 
 class BaseTestCase(unittest.TestCase):
@@ -141,6 +194,32 @@ class DateTestCase(BaseTestCase):
         self.assertNotIn(natasha.Date.CurrentMonthWithOffset, grammars)
         self.assertNotIn(['прошлых', 'месяц'], values)
 
+    def test_resolver(self):
+        resolver = DateResolver(date(2017, 3, 15))
+        for text, grammar, value in (
+            ('21 мая 1996 года', natasha.Date.Full, date(1996, 5, 21)),
+            ('21/05/1996', natasha.Date.FullWithDigits, date(1996, 5, 21)),
+            ('21 мая', natasha.Date.DayAndMonth, date(2017, 5, 21)),
+            ('в конце 2015 года', natasha.Date.PartialYearObject, DateInterval(date(2015, 9, 1), date(2015, 12, 31))),
+            ('в конце февраля', natasha.Date.PartialMonthObject, DateInterval(date(2017, 2, 21), date(2017, 2, 28))),
+            ('18-19 ноября', natasha.Date.DayRange, DateInterval(date(2017, 11, 18), date(2017, 11, 19))),
+            ('в пятницу', natasha.Date.DayOfWeek, date(2017, 3, 17)),
+            ('в прошлом январе', natasha.Date.MonthWithOffset, DateInterval(date(2017, 1, 1), date(2017, 1, 31))),
+            ('в следующем январе', natasha.Date.MonthWithOffset, DateInterval(date(2018, 1, 1), date(2018, 1, 31))),
+            ('в прошлую пятницу', natasha.Date.DayOfWeekWithOffset, date(2017, 3, 10)),
+            ('в прошлом месяце', natasha.Date.CurrentMonthWithOffset, DateInterval(date(2017, 2, 1), date(2017, 2, 28))),
+        ):
+            results = [(x[0], x[2]) for x in resolver.extract(self.combinator.extract(text))]
+            self.assertIn((grammar, value), results)
+        # not a date, not existing date
+        self.assertEqual(list(resolver.extract(self.combinator.extract('1.5 года'))), [])
+        self.assertNotIn(
+            natasha.Date.Full,
+            [x[0] for x in resolver.extract(self.combinator.extract('31 февраля 2016 года'))],
+        )
+        self.assertEqual(set(MONTHS), MONTH_DICTIONARY)
+        self.assertEqual(set(DAYS_OF_WEEK), DAY_OF_WEEK_DICTIONARY)
+
 class MoneyTestCase(BaseTestCase):
 
     def test_int_object_with_prefix(self):
@@ -209,6 +288,24 @@ class MoneyTestCase(BaseTestCase):
         self.assertIn(natasha.Money.HandwrittenNumberWithPrefix, grammars)
         self.assertIn(['семьдесят', 'пять', 'тысяч', 'рублей'], values)
 
+    def test_interpretation(self):
+        interpretation = MoneyInterpretation()
+        for text, grammar, value in (
+            ('1 млрд. долларов', natasha.Money.ObjectWithPrefix, (Decimal('1000000000'), 'USD')),
+            ('3,5 млн рублей', natasha.Money.ObjectWithPrefix, (Decimal('3500000'), 'RUB')),
+            ('5 тыс. руб.', natasha.Money.ObjectWithPrefix, (Decimal('5000'), 'RUB')),
+            ('1.5 рубля', natasha.Money.Object, (Decimal('1.5'), 'RUB')),
+            ('1 000 000 рублей', natasha.Money.Object, (Decimal('1000000'), 'RUB')),
+            ('миллион долларов', natasha.Money.ObjectWithoutActualNumber, (Decimal('1000000'), 'USD')),
+            ('семьдесят пять тысяч рублей', natasha.Money.HandwrittenNumberWithPrefix, (Decimal('75000'), 'RUB')),
+            ('полтора миллиона евро', natasha.Money.HandwrittenNumberWithPrefix, (Decimal('1500000'), 'EUR')),
+            ('сорок два рубля', natasha.Money.HandwrittenNumber, (Decimal('42'), 'RUB')),
+        ):
+            results = [(x[0], x[2]) for x in interpretation.extract(self.combinator.extract(text))]
+            self.assertIn((grammar, value), results)
+        self.assertEqual(set(PREFIX_MULTIPLIERS), PREFIX_DICTIONARY)
+        self.assertEqual(list(interpretation.extract(self.combinator.extract('21 мая 1996 года'))), [])
+
 
 class EventsTestCase(BaseTestCase):
 
@@ -224,3 +321,805 @@ class EventsTestCase(BaseTestCase):
         self.assertEqual(grammar, natasha.Event.AdjWithDescriptor)
         self.assertEqual(
             ['ближневосточного', 'форума'], [x.value for x in match])
+
+
+class CombinatorTestCase(BaseTestCase):
+
+    def test_extract_many(self):
+        texts = [
+            '21 мая 1996 года',
+            'шоу «Вернувшиеся»',
+            '',
+            '1 миллион долларов',
+        ]
+        expected = [
+            (index, grammar, [x.value for x in tokens])
+            for index, text in enumerate(texts)
+            for grammar, tokens in self.combinator.extract(text)
+        ]
+        results = [
+            (index, grammar, [x.value for x in tokens])
+            for index, grammar, tokens in self.combinator.extract_many(texts, batch_size=3)
+        ]
+        self.assertEqual(results, expected)
+        self.assertEqual({x[0] for x in results}, {0, 1, 3})
+
+    def test_extract_many_memoization(self):
+        combinator = natasha.Combinator(natasha.DEFAULT_GRAMMARS, morph_cache=False)
+        tokenizer = combinator.parser.tokenizer
+        analyze = tokenizer.cache
+        words = []
+
+        def cache(word):
+            words.append(word)
+            return analyze(word)
+
+        tokenizer.cache = cache
+        texts = ['21 мая 1996 года', '22 мая 1996 года', '1 миллион долларов', '23 мая']
+        list(combinator.extract_many(texts, batch_size=2))
+        # each word is analyzed once per batch
+        self.assertEqual(words, ['мая', 'года', 'миллион', 'долларов', 'мая'])
+
+        # tokenizer is restored, when iteration is abandoned
+        next(combinator.extract_many(texts))
+        self.assertIs(tokenizer.cache, cache)
+
+    def test_prefilter(self):
+        combinator = natasha.Combinator(natasha.DEFAULT_GRAMMARS, prefilter=False)
+        for text in (
+            '21 мая 1996 года',
+            '1 млрд. долларов',
+            'ПАО «Газпром»',
+            'улица Карла Маркса, дом 1',
+            'Иванов Иван Иванович',
+            'хорошая погода, правда?',
+        ):
+            self.assertEqual(
+                [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)],
+                [(grammar, [x.value for x in tokens]) for grammar, tokens in combinator.extract(text)],
+            )
+        tokens = list(self.combinator.tokenize('хорошая погода, правда?'))
+        names = {grammar.name for grammar in self.combinator.prefilter.select(tokens)}
+        self.assertNotIn('Date__Full', names)
+        self.assertNotIn('Money__Object', names)
+        self.assertNotIn('Address__AdjFullReversed', names)
+        self.assertLess(len(names), len(self.combinator.grammars))
+
+    def test_share_prefixes(self):
+        combinator = natasha.Combinator(natasha.DEFAULT_GRAMMARS, share_prefixes=False)
+        texts = build_address_corpus(size=20) + [
+            'Садовая улица Садовая улица дом 5 улица',
+            'пр-т. 50 лет советской власти, дом 1 лит. Б',
+            'улица В. И. Ленина, дом 1',
+        ]
+        for text in texts:
+            self.assertEqual(
+                [(grammar, [(x.value, x.position) for x in tokens]) for grammar, tokens in self.combinator.extract(text)],
+                [(grammar, [(x.value, x.position) for x in tokens]) for grammar, tokens in combinator.extract(text)],
+            )
+        results = list(self.combinator.extract('улица Карла Маркса, дом 1 литера А'))
+        self.assertEqual(
+            [grammar for grammar, _ in results if isinstance(grammar, natasha.Address)],
+            [
+                natasha.Address.GentFullReversed,
+                natasha.Address.GentFullReversedWithHn,
+                natasha.Address.GentFullReversedWithHnAndLetter,
+            ],
+        )
+
+    def test_profile(self):
+        combinator = natasha.Combinator(natasha.DEFAULT_GRAMMARS, profile=True)
+        text = '21 мая 1996 года ПАО «Газпром» перевело 1 миллион долларов'
+        self.assertEqual(
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in combinator.extract(text)],
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)],
+        )
+        stats = json.loads(combinator.profile_report(as_json=True))
+        self.assertEqual(stats['Date__Full']['matches'], 1)
+        self.assertEqual(stats['Date__Full']['matched_tokens'], 3)
+        self.assertGreater(stats['Date__Full']['partial_matches'], 0)
+        self.assertGreater(stats['Money__Object']['calls'], 0)
+        self.assertIn('Date__Full', combinator.profile_report(limit=20, sort='matches'))
+        with self.assertRaises(ValueError):
+            self.combinator.profile_report()
+
+    def test_extract_stream(self):
+        lines = [
+            'Встреча назначена на 21 мая 1996 года.\n',
+            'Иванов Иван Иванович перевёл 1 миллион долларов\n',
+            'в ПАО «Газпром» по адресу улица Карла Маркса, дом 1\n',
+            'после шоу «Вернувшиеся»',
+        ]
+        text = ''.join(lines)
+        expected = [
+            (grammar, [(x.value, x.position) for x in tokens])
+            for grammar, tokens in self.combinator.extract(text)
+        ]
+        for chunk_size in (7, 64, 4096):
+            for source in (io.StringIO(text), iter(lines)):
+                results = [
+                    (grammar, [(x.value, x.position) for x in tokens])
+                    for grammar, tokens in self.combinator.extract_stream(source, chunk_size=chunk_size)
+                ]
+                self.assertEqual(results, expected)
+
+    def test_read_segments(self):
+        # long line, which is cut on spaces, with tokens containing spaces
+        text = 'перевёл 1 000 000 рублей, звоните +7 (495) 123 45 67\n 8 800 555 35 35, с 10 - 15 мая 2017 года ' * 5
+        expected = [(x.value, x.position) for x in self.combinator.parser.tokenizer.transform(text)]
+        for chunk_size in (1, 7, 16, 64):
+            segments = list(read_segments(io.StringIO(text), chunk_size=chunk_size))
+            self.assertEqual(''.join(segment for _, segment in segments), text)
+            self.assertGreater(len(segments), 1)
+            tokens = self.combinator.tokenize_segments(segments)
+            self.assertEqual([(x.value, x.position) for x in tokens], expected)
+        # line without letters isn't cut
+        self.assertEqual(len(list(read_segments(io.StringIO('1 000 ' * 100), chunk_size=16))), 1)
+        if sys.version_info.major >= 3:
+            with self.assertRaises(TypeError):
+                list(read_segments(io.BytesIO(text.encode('utf-8'))))
+
+    def test_extract_compact(self):
+        text = 'Иванов Иван Иванович перевёл 1 миллион долларов в ПАО «Газпром» по адресу улица К. Маркса дом 15'
+        expected = list(self.combinator.extract(text))
+        matches = list(self.combinator.extract_compact(text))
+        self.assertEqual([match.grammar for match in matches], [grammar for grammar, _ in expected])
+        for match, (_, tokens) in zip(matches, expected):
+            self.assertEqual(match.span, (tokens[0].position[0], tokens[-1].position[1]))
+            self.assertEqual(match.normalized, get_normalized_text(tokens))
+            self.assertEqual(
+                [(x.value, x.position) for x in match.tokens],
+                [(x.value, x.position) for x in tokens],
+            )
+        self.assertIn('Иванов Иван Иванович', [match.text for match in matches])
+        self.assertEqual(matches, list(self.combinator.extract_compact(text)))
+
+    def test_reset_nested_grammars(self):
+        # text, which ends inside of match of nested grammar, doesn't affect next text
+        text = 'улица К. Маркса дом 15 литера Б'
+        expected = [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)]
+        list(self.combinator.extract('улица К. Маркса дом'))
+        self.assertEqual(
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)],
+            expected,
+        )
+
+    def test_copy_grammars(self):
+        combinator = natasha.Combinator(natasha.DEFAULT_GRAMMARS)
+        self.assertEqual(
+            [grammar.name for grammar in combinator.grammars],
+            [grammar.name for grammar in self.combinator.grammars],
+        )
+        for a, b in zip(combinator.grammars, self.combinator.grammars):
+            self.assertIsNot(a, b)
+            self.assertEqual(set(collect_labels(a)), set(collect_labels(b)))
+        text = 'улица К. Маркса дом 15 литера Б, 21 мая 1996 года'
+        self.assertEqual(
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in combinator.extract(text)],
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)],
+        )
+
+    def test_morph_cache(self):
+        text = '21 мая 1996 года Иванов Иван Иванович перевёл 1 миллион долларов'
+        self.assertIs(self.combinator.morph_cache, DEFAULT_MORPH_CACHE)
+        cache = MorphCache(maxsize=100)
+        dates = natasha.Combinator([natasha.Date], morph_cache=cache)
+        money = natasha.Combinator([natasha.Money], morph_cache=cache)
+        uncached = natasha.Combinator(natasha.DEFAULT_GRAMMARS, morph_cache=False)
+        self.assertIsNone(uncached.morph_cache)
+        list(dates.extract(text))
+        misses = cache.cache_info().misses
+        self.assertEqual(cache.cache_info().hits, 0)
+        # words are analyzed once for both combinators
+        self.assertEqual(
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in money.extract(text)],
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in uncached.extract(text) if grammar in natasha.Money],
+        )
+        self.assertEqual(cache.cache_info().misses, misses)
+        self.assertEqual(cache.cache_info().hits, misses)
+        self.assertEqual(cache.hit_rate, 0.5)
+        self.assertEqual(cache('мая'), uncached.parser.tokenizer.get_word_forms('мая'))
+
+    def test_morph_cache_eviction_and_warm(self):
+        cache = MorphCache(maxsize=3)
+        for word in ('мая', 'года', 'долларов', 'мая', 'миллион'):
+            cache(word)
+        self.assertEqual(cache.cache_info(), (1, 4, 3, 3))
+        self.assertNotIn('года', cache)
+        self.assertIn('мая', cache)
+        cache.clear()
+        self.assertEqual(cache.cache_info(), (0, 0, 3, 0))
+        path = os.path.join(tempfile.mkdtemp(), 'frequencies.txt')
+        try:
+            with io.open(path, 'w', encoding='utf-8') as file:
+                file.write('года 100\nмая 50\n\nрублей 10\nлет 5\n')
+            self.assertEqual(cache.warm(read_frequency_list(path)), 3)
+        finally:
+            shutil.rmtree(os.path.dirname(path))
+        self.assertEqual(cache.cache_info(), (0, 0, 3, 3))
+        self.assertNotIn('лет', cache)
+        # the most frequent words are evicted last
+        cache('долларов')
+        self.assertEqual(set(cache.forms), {'года', 'мая', 'долларов'})
+
+
+class IncrementalExtractorTestCase(BaseTestCase):
+
+    def dump(self, matches):
+        return [(grammar, [(x.value, x.position) for x in tokens]) for grammar, tokens in matches]
+
+    def test_split_sentences(self):
+        text = 'Иванов живёт на ул. Ленина, д. 5.\nТелефон 8 800 555 35 35! А 1. 2'
+        spans = split_sentences(text)
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(text))
+        self.assertEqual(
+            [text[start:end] for start, end in spans],
+            ['Иванов живёт на ул. Ленина, д. 5.\n', 'Телефон 8 800 555 35 35! ', 'А 1. 2'],
+        )
+
+    def test_edit(self):
+        sentences = [
+            'Встреча назначена на 21 мая 1996 года в Москве. ',
+            'Иванов Иван Иванович перевёл 1 миллион долларов. ',
+            'Офис ПАО «Газпром» переехал на улицу Карла Маркса, дом 1. ',
+            'После шоу «Вернувшиеся» погода будет хорошей.',
+        ]
+        text = ''.join(sentences)
+        extractor = IncrementalExtractor(self.combinator, text)
+        self.assertEqual(self.dump(extractor.matches), self.dump(self.combinator.extract(text)))
+        self.assertEqual(len(extractor.sentences), len(sentences))
+
+        start = text.index('1 миллион')
+        end = start + len('1 миллион долларов')
+        edited = text[:start] + '3,5 млн рублей' + text[end:]
+        matches = extractor.edit(start, end, '3,5 млн рублей')
+        self.assertEqual(self.dump(matches), self.dump(self.combinator.extract(edited)))
+        self.assertEqual(extractor.tokenized, 1)
+
+        # grammars, selected by prefilter for edited text, are already known
+        matches = extractor.update(text)
+        self.assertEqual(self.dump(matches), self.dump(self.combinator.extract(text)))
+        self.assertEqual(extractor.tokenized, 1)
+        self.assertLess(extractor.parsed, len(sentences))
+
+        for text in (
+            text.replace('дом 1', 'дом 15 литера Б'),
+            text.replace('Карла Маркса, дом 1. ', 'К. Маркса дом'),
+            text.replace('. Иванов', ' Иванов'),
+            'Пётр Петров. ' + text,
+            '',
+            text,
+        ):
+            self.assertEqual(self.dump(extractor.update(text)), self.dump(self.combinator.extract(text)))
+            self.assertEqual(extractor.text, text)
+
+
+class ExtractionPoolTestCase(BaseTestCase):
+
+    def test_imap(self):
+        texts = [
+            '21 мая 1996 года',
+            '1 миллион долларов',
+            'шоу «Вернувшиеся»',
+        ]
+        expected = [
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)]
+            for text in texts
+        ]
+        with ExtractionPool(natasha.DEFAULT_GRAMMARS, processes=2) as pool:
+            results = [
+                [(grammar, [x.value for x in tokens]) for grammar, tokens in matches]
+                for matches in pool.imap(texts, chunksize=2)
+            ]
+            self.assertEqual(results, expected)
+            results = sorted(
+                (index, [(grammar, [x.value for x in tokens]) for grammar, tokens in matches])
+                for index, matches in pool.imap_unordered(texts)
+            )
+            self.assertEqual([x[1] for x in results], expected)
+
+    def test_extract_document(self):
+        text = ' '.join(build_corpus(size=40) + build_address_corpus(size=10))
+        expected = [
+            (grammar, [(x.value, x.position) for x in tokens])
+            for grammar, tokens in self.combinator.extract(text)
+        ]
+        with ExtractionPool(natasha.DEFAULT_GRAMMARS, processes=2) as pool:
+            results = [
+                (grammar, [(x.value, x.position) for x in tokens])
+                for grammar, tokens in pool.extract_document(text, shard_size=512)
+            ]
+        self.assertEqual(results, expected)
+
+    def test_split_shards(self):
+        text = 'Первое предложение. Второе предложение. Третье предложение.'
+        self.assertEqual(
+            list(split_shards(text, size=10)),
+            [(0, 'Первое предложение. '), (20, 'Второе предложение. '), (40, 'Третье предложение.')],
+        )
+        self.assertEqual(list(split_shards(text, size=100)), [(0, text)])
+        text = 'Компания «Второе предложение. Третье предложение» сообщила. Четвертое предложение.'
+        self.assertEqual(
+            [shard for _, shard in split_shards(text, size=10)],
+            ['Компания «Второе предложение. Третье предложение» сообщила. ', 'Четвертое предложение.'],
+        )
+        # quote, which is never closed
+        self.assertEqual(len(list(split_shards(text.replace('»', ''), size=10, max_quote_length=20))), 3)
+        self.assertEqual(list(split_shards('')), [(0, '')])
+
+
+@unittest.skipIf(AsyncCombinator is None, 'asyncio front-end requires Python 3.5.3+')
+class AsyncCombinatorTestCase(BaseTestCase):
+
+    # coroutines are run without async syntax, so module can be compiled by python 2
+
+    texts = [
+        '21 мая 1996 года',
+        '1 миллион долларов',
+        'шоу «Вернувшиеся»',
+    ]
+
+    def get_expected(self):
+        return [
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in self.combinator.extract(text)]
+            for text in self.texts
+        ]
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        super(AsyncCombinatorTestCase, self).setUp()
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_iterator(self, iterator):
+        results = []
+        while True:
+            try:
+                results.append(self.loop.run_until_complete(iterator.__anext__()))
+            except StopAsyncIteration:
+                return results
+
+    def run_extraction(self, combinator):
+        try:
+            first = self.loop.run_until_complete(combinator.extract(self.texts[0]))
+            results = self.run_iterator(combinator.extract_many(self.texts))
+        finally:
+            combinator.close()
+        return [
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in matches]
+            for matches in [first] + [matches for _, matches in sorted(results)]
+        ]
+
+    def test_thread_executor(self):
+        combinator = AsyncCombinator(natasha.DEFAULT_GRAMMARS, workers=2)
+        expected = self.get_expected()
+        self.assertEqual(self.run_extraction(combinator), expected[:1] + expected)
+
+    def test_process_executor(self):
+        combinator = AsyncCombinator(natasha.DEFAULT_GRAMMARS, executor='process', workers=2)
+        expected = self.get_expected()
+        self.assertEqual(self.run_extraction(combinator), expected[:1] + expected)
+
+    def test_event_loops(self):
+        combinator = AsyncCombinator(natasha.DEFAULT_GRAMMARS)
+        expected = self.get_expected()
+        for _ in range(2):
+            # requests wait for slot of semaphore of their own loop
+            results = self.loop.run_until_complete(asyncio.gather(*[
+                combinator.extract(text) for text in self.texts
+            ]))
+            self.assertEqual(
+                [
+                    [(grammar, [x.value for x in tokens]) for grammar, tokens in matches]
+                    for matches in results
+                ],
+                expected,
+            )
+            self.tearDown()
+            self.setUp()
+        combinator.close()
+
+    def test_timeout(self):
+        combinator = AsyncCombinator(natasha.DEFAULT_GRAMMARS, timeout=0.001)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.loop.run_until_complete(combinator.extract(' '.join(self.texts * 100)))
+        # slot is released when extraction is finished
+        matches = self.loop.run_until_complete(combinator.extract(self.texts[0], timeout=60))
+        combinator.close()
+        self.assertEqual(
+            [(grammar, [x.value for x in tokens]) for grammar, tokens in matches],
+            self.get_expected()[0],
+        )
+
+
+class PipelinesTestCase(unittest.TestCase):
+
+    def test_compiled_dictionaries(self):
+        for pipeline in natasha.DEFAULT_PIPELINES:
+            dictionary = pipeline().dictionary
+            self.assertIsInstance(dictionary, CompletionDAWG)
+            self.assertEqual(set(dictionary.keys()), pipeline.Dictionary)
+            for key in pipeline.Dictionary:
+                self.assertIn(key, dictionary)
+            self.assertNotIn('несуществующий', dictionary)
+
+    def test_shipped_dictionaries_match_sources(self):
+        # pipelines load entries from compiled files, Dictionary attributes are only their source,
+        # run `python setup.py build_dicts` after changing them
+        for pipeline in natasha.DEFAULT_PIPELINES:
+            self.assertTrue(os.path.exists(pipeline.Path), pipeline.Path)
+            dictionary = PythonCompletionDAWG().load(pipeline.Path)
+            self.assertEqual(set(dictionary.keys()), pipeline.Dictionary, pipeline.__name__)
+        merged = MergedGazetteerPipeline([pipeline() for pipeline in natasha.DEFAULT_PIPELINES])
+        self.assertEqual(
+            set(merged.dictionary.keys()),
+            set.union(*[set(pipeline.Dictionary) for pipeline in natasha.DEFAULT_PIPELINES]),
+        )
+
+    def apply(self, pipelines, text):
+        stream = Tokenizer().transform(text)
+        for pipeline in pipelines:
+            stream = pipeline(stream)
+        return [
+            (token.value, token.position, {frozenset(x['grammemes']) for x in token.forms})
+            for token in stream
+        ]
+
+    def test_merged_gazetteer(self):
+        text = 'директор музея группы компаний и центра, торговый дом и академия наук'
+        pipelines = [pipeline() for pipeline in natasha.DEFAULT_PIPELINES]
+        merged = MergedGazetteerPipeline(pipelines)
+        tokens = self.apply([merged], text)
+        self.assertEqual(tokens, self.apply(pipelines, text))
+
+        forms = {value: grammemes for value, _, grammemes in tokens}
+        self.assertIn(frozenset({'Orgn/Social'}), forms['музея'])
+        self.assertIn(frozenset({'Orgn/Educational'}), forms['музея'])
+        self.assertIn(frozenset({'Orgn/Social'}), forms['центра'])
+        self.assertIn(frozenset({'Orgn/Commercial'}), forms['центра'])
+        self.assertIn(frozenset({'Person/Position'}), forms['директор'])
+        self.assertEqual(forms['группы_компаний'], {frozenset({'Orgn/Commercial'})})
+        self.assertEqual(forms['академия_наук'], {frozenset({'Orgn/Educational'})})
+
+        # 'группа' is also a prefix of 'группа_компания', sequential pipelines
+        # lose commercial grammeme in that case
+        forms = {value: grammemes for value, _, grammemes in self.apply([merged], 'группа и совет')}
+        self.assertIn(frozenset({'Orgn/Commercial'}), forms['группа'])
+        self.assertIn(frozenset({'Orgn/Social'}), forms['группа'])
+        self.assertIn(frozenset({'Orgn/Social'}), forms['совет'])
+
+
+class LazyImportTestCase(unittest.TestCase):
+
+    IMPORT_SCRIPT = '''
+import sys
+import json
+
+{statement}
+
+print(json.dumps(sorted(x for x in sys.modules if x.startswith('natasha'))))
+'''
+
+    def get_imported_modules(self, statement):
+        output = subprocess.check_output([
+            sys.executable,
+            '-c',
+            self.IMPORT_SCRIPT.format(statement=statement),
+        ])
+        return json.loads(output.decode('utf-8'))
+
+    def test_import_money(self):
+        lazy = self.get_imported_modules('from natasha import Money')
+        eager = self.get_imported_modules('from natasha import DEFAULT_GRAMMARS, DEFAULT_PIPELINES')
+        self.assertIn('natasha.grammars.money', lazy)
+        for module in (
+            'natasha.combinator',
+            'natasha.grammars.pipelines',
+            'natasha.grammars.person',
+            'natasha.grammars.location',
+            'natasha.grammars.organisation',
+            'natasha.grammars.date',
+        ):
+            self.assertNotIn(module, lazy)
+            self.assertIn(module, eager)
+        for module in (
+            'natasha.grammars.money.interpretation',
+            'natasha.grammars.date.resolver',
+        ):
+            self.assertNotIn(module, lazy)
+            self.assertNotIn(module, eager)
+
+    def test_lazy_grammar_attributes(self):
+        modules = self.get_imported_modules(
+            'from natasha.grammars.money import MoneyInterpretation'
+        )
+        self.assertIn('natasha.grammars.money.interpretation', modules)
+
+    def test_import_errors(self):
+        name = 'natasha_lazy_import_test'
+        sys.modules[name] = types.ModuleType(str(name))
+        try:
+            lazy_module(name, {
+                'Missing': 'natasha.missing',
+                'Absent': 'natasha.utils',
+            })
+            with self.assertRaises(ImportError) as context:
+                from natasha_lazy_import_test import Missing
+            self.assertIn('natasha.missing', str(context.exception))
+            self.assertIsInstance(context.exception.__cause__, ImportError)
+            with self.assertRaises(ImportError) as context:
+                from natasha_lazy_import_test import Absent
+            self.assertIn('has no attribute', str(context.exception))
+            self.assertIsInstance(context.exception.__cause__, AttributeError)
+        finally:
+            del sys.modules[name]
+
+
+class BenchmarkTestCase(unittest.TestCase):
+
+    def test_corpus(self):
+        self.assertEqual(build_corpus(size=10, seed=2), build_corpus(size=10, seed=2))
+        self.assertNotEqual(build_corpus(size=10, seed=2), build_corpus(size=10, seed=3))
+
+    def test_report(self):
+        report = benchmark_extraction(size=5, repeat=2)
+        self.assertEqual(report['corpus']['texts'], 5)
+        self.assertEqual(
+            set(report['grammars']),
+            {grammar.__name__ for grammar in natasha.DEFAULT_GRAMMARS},
+        )
+        self.assertEqual(
+            set(report['pipelines']),
+            {pipeline.__name__ for pipeline in natasha.DEFAULT_PIPELINES} | {'MergedGazetteerPipeline'},
+        )
+        self.assertGreater(report['extract']['tokens_per_second'], 0)
+        self.assertEqual(set(report['extract_many']), {'extract', 'extract_many'})
+        self.assertGreaterEqual(report['extract']['spread'], 0)
+        self.assertEqual(list(compare(report, report)), [])
+
+    @unittest.skipIf(read_memory() is None, 'memory of process is measured only on linux')
+    def test_gazetteer_memory(self):
+        report = benchmark_gazetteer_memory(workers=1)
+        self.assertEqual(report['dictionary_size'], get_dictionary_size())
+        # compiled dictionaries are small, so there is nothing to share between workers
+        self.assertLess(report['dictionary_size'], 64)
+        for name in ('private', 'inherited'):
+            self.assertEqual(set(report[name]), {'rss', 'pss', 'private'})
+
+    def test_compare(self):
+        baseline = {
+            'extract': {'tokens_per_second': 1000.0, 'latency_p99': 10.0, 'peak_memory': 100, 'spread': 0.0},
+            'corpus': {'tokens': 100},
+        }
+        report = {
+            'extract': {'tokens_per_second': 700.0, 'latency_p99': 11.0, 'peak_memory': 130, 'spread': 0.0},
+            'corpus': {'tokens': 200},
+        }
+        self.assertEqual(
+            sorted(compare(report, baseline, threshold=0.2)),
+            [('extract.peak_memory', 100, 130), ('extract.tokens_per_second', 1000.0, 700.0)],
+        )
+        # noisy runs, timings are within spread, memory isn't
+        report['extract']['spread'] = 0.3
+        self.assertEqual(
+            list(compare(report, baseline, threshold=0.2)),
+            [('extract.peak_memory', 100, 130)],
+        )
+
+    def test_compare_noisy_runs(self):
+        def run(seconds):
+            return {'extract': {'seconds': seconds, 'tokens_per_second': 100 / seconds, 'peak_memory': 100}}
+
+        # same code measured twice, some runs are slowed down by other processes
+        baseline = merge_runs([run(1.0), run(1.4), run(1.1)])
+        report = merge_runs([run(1.3), run(1.25), run(1.2)])
+        self.assertEqual(baseline['extract']['seconds'], 1.0)
+        self.assertEqual(baseline['extract']['tokens_per_second'], 100.0)
+        self.assertAlmostEqual(baseline['extract']['spread'], 0.4)
+        self.assertEqual(list(compare(report, baseline)), [])
+
+        # same slowdown without noise is regression
+        baseline = merge_runs([run(1.0), run(1.0), run(1.05)])
+        report = merge_runs([run(1.3), run(1.3), run(1.35)])
+        self.assertEqual(
+            sorted(path for path, _, _ in compare(report, baseline)),
+            ['extract.seconds', 'extract.tokens_per_second'],
+        )
+
+
+class DistanceTestCase(unittest.TestCase):
+
+    def test_bounded_distance(self):
+        words = ['', 'a', 'ca', 'abc', 'acb', 'путин', 'путина', 'пупкин', 'вертинская']
+        for a in words:
+            for b in words:
+                distance = damerau_levenshtein_distance(a, b)
+                for limit in range(4):
+                    self.assertEqual(
+                        bounded_damerau_levenshtein_distance(a, b, limit),
+                        min(distance, limit + 1),
+                    )
+
+    def test_is_similar(self):
+        self.assertTrue(is_similar('иванов', 'иваноф', 2))
+        self.assertTrue(is_similar('ca', 'abc', 2))
+        self.assertFalse(is_similar('иванов', 'петров', 2))
+
+
+class ServerTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.extractor = Extractor()
+        cls.server = create_server(cls.extractor, port=0, quiet=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def request(self, method, path, data=None):
+        connection = HTTPConnection(*self.server.server_address)
+        body = None if data is None else json.dumps(data).encode('utf-8')
+        connection.request(method, path, body)
+        response = connection.getresponse()
+        result = json.loads(response.read().decode('utf-8'))
+        connection.close()
+        return response.status, result
+
+    def test_extract(self):
+        status, data = self.request('POST', '/extract', {'texts': ['иванов иван иванович', '']})
+        self.assertEqual(status, 200)
+        matches, empty = data['results']
+        self.assertEqual(empty, [])
+        match = [x for x in matches if x['rule'] == 'Full'][0]
+        self.assertEqual(match['grammar'], 'Person')
+        self.assertEqual(match['span'], [0, 20])
+        self.assertEqual(match['attributes']['firstname'], {'normalized': 'иван', 'span': [7, 11]})
+
+    def test_errors(self):
+        status, data = self.request('POST', '/extract', {'documents': []})
+        self.assertEqual(status, 400)
+        status, data = self.request('GET', '/unknown')
+        self.assertEqual(status, 404)
+
+    def test_invalid_content_length(self):
+        for value in ('abc', '-1'):
+            connection = HTTPConnection(*self.server.server_address)
+            connection.putrequest('POST', '/extract')
+            connection.putheader('Content-Length', value)
+            connection.endheaders()
+            response = connection.getresponse()
+            data = json.loads(response.read().decode('utf-8'))
+            connection.close()
+            self.assertEqual(response.status, 400, value)
+            self.assertEqual(data, {'error': 'Invalid Content-Length'})
+
+    def test_internal_error(self):
+
+        class BrokenExtractor(object):
+
+            def extract(self, texts):
+                raise ValueError('/home/natasha/secret.txt')
+
+        stderr = sys.stderr
+        sys.stderr = io.StringIO()
+        self.server.extractor = BrokenExtractor()
+        try:
+            status, data = self.request('POST', '/extract', {'text': 'текст'})
+            log = sys.stderr.getvalue()
+        finally:
+            self.server.extractor = self.extractor
+            sys.stderr = stderr
+        self.assertEqual(status, 500)
+        self.assertEqual(data, {'error': 'Internal server error'})
+        self.assertIn('secret.txt', log)
+
+    def test_health_and_metrics(self):
+        status, data = self.request('GET', '/health')
+        self.assertEqual(status, 200)
+        self.assertEqual(data['status'], 'ok')
+        self.request('POST', '/extract', {'text': '1 миллион долларов'})
+        status, data = self.request('GET', '/metrics')
+        self.assertEqual(status, 200)
+        self.assertGreaterEqual(data['texts'], 1)
+        self.assertGreaterEqual(data['matches'], 1)
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), 'unix sockets are not supported')
+    def test_unix_socket(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'natasha.sock')
+        server = create_server(self.extractor, socket=path, quiet=True)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(path)
+            client.sendall(b'GET /health HTTP/1.0\r\n\r\n')
+            response = b''
+            while True:
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                response += chunk
+            client.close()
+            self.assertTrue(response.startswith(b'HTTP/1.0 200'))
+            self.assertIn(b'"status": "ok"', response)
+        finally:
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(directory)
+
+    @unittest.skipIf(not hasattr(socket, 'AF_UNIX'), 'unix sockets are not supported')
+    def test_unix_socket_path(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'natasha.sock')
+        try:
+            # socket of closed server is replaced
+            create_server(self.extractor, socket=path, quiet=True).server_close()
+            create_server(self.extractor, socket=path, quiet=True).server_close()
+            os.unlink(path)
+            # regular file isn't removed
+            with open(path, 'w') as file:
+                file.write('data')
+            with self.assertRaises(ValueError):
+                create_server(self.extractor, socket=path, quiet=True)
+            with open(path) as file:
+                self.assertEqual(file.read(), 'data')
+        finally:
+            shutil.rmtree(directory)
+
+
+class CommandLineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'input.txt')
+        with io.open(self.path, 'w', encoding='utf-8') as file:
+            file.write('иванов иван иванович\n\nул. Ленина, 5\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_command(self, *args):
+        output = io.StringIO()
+        run_command(['extract', '--progress', '0'] + list(args) + [self.path], output=output)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_extract(self):
+        records = self.run_command('--grammars', 'Person,Address')
+        self.assertEqual([x['line'] for x in records], [1, 3])
+        self.assertEqual({x['grammar'] for x in records[0]['matches']}, {'Person'})
+        self.assertIn('Address', {x['grammar'] for x in records[1]['matches']})
+        self.assertEqual(records, self.run_command('--grammars', 'Person,Address', '--workers', '2'))
+
+        records = self.run_command('--grammars', 'Person', '--format', 'files')
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['path'], self.path)
+
+    def test_locale_encoding(self):
+        path = os.path.join(self.directory, 'output.jsonl')
+        stdout = sys.stdout
+        # stdout of LANG=C environment
+        sys.stdout = io.open(path, 'w', encoding='ascii')
+        try:
+            run_command(['extract', '--progress', '0', '--grammars', 'Person', self.path])
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        with io.open(path, encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(records, self.run_command('--grammars', 'Person'))
+        self.assertIn('иван', records[0]['matches'][0]['attributes']['firstname']['normalized'])
+
+    def test_unknown_grammar(self):
+        with self.assertRaises(SystemExit):
+            self.run_command('--grammars', 'Person,Persons')
@@ -0,0 +1,207 @@
+# coding: utf-8
+from __future__ import unicode_literals
+
+import re
+import sys
+
+from types import ModuleType
+from importlib import import_module
+
+
+def raise_from(exception, cause):
+    '''
+    Raises `exception` chained to `cause`, like `raise exception from cause`
+    in python 3 (python 2 just raises `exception`)
+    '''
+    exception.__cause__ = cause
+    raise exception
+
+
+class LazyModule(ModuleType):
+
+    '''
+    Module that imports attributes from other modules on first access.
+    `__lazy_attributes__` maps attribute name to name of module, which defines it
+    '''
+
+    def __getattr__(self, name):
+        attributes = self.__dict__.get('__lazy_attributes__', {})
+        if name not in attributes:
+            raise AttributeError('module {0!r} has no attribute {1!r}'.format(
+                self.__name__,
+                name,
+            ))
+        try:
+            value = getattr(import_module(attributes[name]), name)
+        except (ImportError, AttributeError) as error:
+            # `from module import name` reports AttributeError as "cannot import name",
+            # so both errors are raised as ImportError with the original message
+            raise_from(ImportError(
+                'failed to import {0} from {1}: {2}'.format(name, attributes[name], error)
+            ), error)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(
+            set(self.__dict__) | set(self.__dict__.get('__lazy_attributes__', {}))
+        )
+
+
+def lazy_module(name, attributes):
+    '''
+    Replaces module in sys.modules with LazyModule, which has same contents
+    and imports given attributes on demand
+    '''
+    module = sys.modules[name]
+    lazy = LazyModule(str(name), module.__doc__)
+    lazy.__dict__.update(module.__dict__)
+    lazy.__lazy_attributes__ = attributes
+    lazy.__all__ = sorted(attributes)
+    sys.modules[name] = lazy
+    return lazy
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# segments are cut only after whitespace before letter: tokens, which contain spaces
+# (separated numbers, ranges and phones), never contain letters, and token can't start
+# with whitespace before letter, so segments are tokenized exactly as part of whole text
+LINE_BOUNDARY_REGEX = re.compile(r'[\r\n]\s*(?=[^\W\d_])', re.UNICODE)
+SPACE_BOUNDARY_REGEX = re.compile(r'\s+(?=[^\W\d_])', re.UNICODE)
+
+
+def find_last_boundary(text, regex):
+    end = None
+    for match in regex.finditer(text):
+        end = match.end()
+    return end
+
+
+def read_chunks(source, chunk_size):
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def read_segments(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Reads text from file-like object or iterable of strings and yields (offset, segment) tuples,
+    where segments are cut after line breaks (or spaces, when line is longer than `chunk_size`)
+    before words, so tokens are never split between segments. Line without such boundary
+    (like long list of numbers) is kept in single segment, whatever its length is
+    '''
+    if hasattr(source, 'read'):
+        chunks = read_chunks(source, chunk_size)
+    else:
+        chunks = iter(source)
+    offset = 0
+    tail = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if bytes is not str and isinstance(chunk, bytes):
+            raise TypeError('Text is expected, open file in text mode or decode it')
+        buffer = tail + chunk
+        boundary = find_last_boundary(buffer, LINE_BOUNDARY_REGEX)
+        if boundary is None and len(buffer) > chunk_size:
+            boundary = find_last_boundary(buffer, SPACE_BOUNDARY_REGEX)
+        if boundary is None:
+            tail = buffer
+            continue
+        segment, tail = buffer[:boundary], buffer[boundary:]
+        yield offset, segment
+        offset += len(segment)
+    if tail:
+        yield offset, tail
+
+
+# text is cut after line break or end of sentence punctuation and spaces before capital letter
+# or quote. Punctuation ends sentence only after number, quote or word of 6 characters at least,
+# so abbreviations and initials (like "ул. Ленина" or "К. Маркса") aren't cut.
+# Tokens never contain both spaces and letters or quotes, so each sentence
+# is tokenized exactly as part of whole text
+SENTENCE_BOUNDARY_REGEX = re.compile(
+    r'(?:(?:(?<=\w{6})|(?<=\d)|(?<=[»“")]))[.!?…]+\s+(?=[А-ЯЁA-Z«„"])|[\r\n]\s*(?=[^\W\d_]))',
+    re.UNICODE,
+)
+
+OPENING_QUOTES = '«„'
+CLOSING_QUOTES = '»“'
+GENERIC_QUOTE = '"'
+QUOTE_REGEX = re.compile('[{0}{1}{2}]'.format(OPENING_QUOTES, CLOSING_QUOTES, GENERIC_QUOTE))
+
+DEFAULT_SHARD_SIZE = 16 * 1024
+DEFAULT_MAX_QUOTE_LENGTH = 4 * 1024
+
+
+def split_sentences(text):
+    '''
+    Returns (start, end) offsets of sentences, which cover whole text
+    '''
+    spans = []
+    start = 0
+    for match in SENTENCE_BOUNDARY_REGEX.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    spans.append((start, len(text)))
+    return spans
+
+
+def split_shards(text, size=DEFAULT_SHARD_SIZE, max_quote_length=DEFAULT_MAX_QUOTE_LENGTH):
+    '''
+    Yields (offset, shard) tuples, shards are made of whole sentences and are at least
+    `size` characters long (except the last one). Text isn't cut inside of quotes
+    (quoted names of organisations can contain sentence boundaries), unless quote
+    isn't closed in `max_quote_length` characters
+    '''
+    start = 0
+    depth = 0
+    generic = False
+    opened = None
+    for sentence_start, sentence_end in split_sentences(text):
+        if sentence_start - start >= size:
+            if not depth and not generic:
+                yield start, text[start:sentence_start]
+                start = sentence_start
+            elif sentence_start - opened > max_quote_length:
+                # quote is never closed
+                yield start, text[start:sentence_start]
+                start = sentence_start
+                depth = 0
+                generic = False
+        for match in QUOTE_REGEX.finditer(text, sentence_start, sentence_end):
+            quote = match.group()
+            if not depth and not generic:
+                opened = match.start()
+            if quote in OPENING_QUOTES:
+                depth += 1
+            elif quote in CLOSING_QUOTES:
+                depth = max(depth - 1, 0)
+            else:
+                generic = not generic
+    yield start, text[start:]
+
+
+class DisjointSet(object):
+
+    def __init__(self, size):
+        self.parents = list(range(size))
+
+    def find(self, item):
+        parents = self.parents
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            if b < a:
+                a, b = b, a
+            self.parents[b] = a
@@ -44,4 +44,7 @@ setup(
     install_requires=[
         'yargy==0.6.0'
     ],
+    extras_require={
+        'clustering': ['numpy>=1.13'],
+    },
 )